@@ -0,0 +1,246 @@
+import argparse
+import multiprocessing
+import os
+from array import array
+
+import landmarks
+from graph import load_graph, load_index, save_index
+from landmarks import BEYOND, UNREACHED, choose_landmarks
+
+ANALYTICS_FILE = "analytics.snapshot"
+
+# References searched together, one bit each of a machine word
+WORD_BITS = 64
+
+# Number of best-connected references used by default
+REFERENCES = 64
+
+
+class SeparationStats():
+
+    def __init__(self, references, distances, histograms, eccentricities):
+        """
+        Create whole-graph separation statistics.
+        `references` lists the person indices searched from, and
+        `distances` holds one byte per (reference, person): the degrees
+        from reference `k` to person `p` are `distances[k * n + p]`,
+        UNREACHED, or BEYOND if they are BEYOND or more.
+        `histograms` holds one row per reference counting the people at
+        each exact distance from it, and `eccentricities[k]` is the
+        greatest distance from reference `k` to anyone it reaches.
+        """
+        self.references = references
+        self.distances = distances
+        self.histograms = histograms
+        self.eccentricities = eccentricities
+        k = len(references)
+        self.n = len(distances) // k if k else 0
+        self.width = len(histograms) // k if k else 0
+
+    @classmethod
+    def build(cls, directory, references, processes=None):
+        """
+        Search from every person index in `references` over the dataset
+        in `directory`, WORD_BITS references per breadth-first search,
+        with one batch per task on a pool of worker processes.
+        """
+        references = array("i", references)
+        batches = [
+            references[i:i + WORD_BITS]
+            for i in range(0, len(references), WORD_BITS)
+        ]
+
+        distances = bytearray()
+        rows = []
+        with multiprocessing.Pool(
+            processes, initializer=landmarks.init_worker,
+            initargs=(directory,)
+        ) as pool:
+            for batch_distances, batch_rows in pool.imap(
+                batch_distances_and_histograms, batches
+            ):
+                distances.extend(batch_distances)
+                rows.extend(batch_rows)
+
+        # Pad every histogram row to the longest so they form a matrix
+        width = max((len(row) for row in rows), default=0)
+        histograms = array("q")
+        eccentricities = array("i")
+        for row in rows:
+            histograms.extend(row)
+            histograms.extend([0] * (width - len(row)))
+            eccentricities.append(len(row) - 1)
+        return cls(references, distances, histograms, eccentricities)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Memory-map the statistics saved for `directory`, or return None if
+        they are missing or stale.
+        """
+        sections = load_index(directory, ANALYTICS_FILE, "analytics")
+        if sections is None:
+            return None
+        return cls(sections["references"], sections["distances"],
+                   sections["histograms"], sections["eccentricities"])
+
+    def save(self, directory):
+        """
+        Save the statistics next to the dataset in `directory`.
+        """
+        save_index(
+            directory, ANALYTICS_FILE, "analytics",
+            {
+                "references": self.references,
+                "distances": self.distances,
+                "histograms": self.histograms,
+                "eccentricities": self.eccentricities
+            }
+        )
+
+    def distances_from(self, k):
+        """
+        Return the bytes of distances from reference `k` to every person.
+        """
+        return self.distances[k * self.n:(k + 1) * self.n]
+
+    def histogram(self, k=None):
+        """
+        Return a list counting the people at each distance from
+        reference `k`, or summed over all references.
+        """
+        if k is not None:
+            return list(self.histograms[k * self.width:(k + 1) * self.width])
+        total = [0] * self.width
+        for k in range(len(self.references)):
+            for d, count in enumerate(self.histogram(k)):
+                total[d] += count
+        return total
+
+    def eccentricity_bounds(self, person):
+        """
+        Return (lower, upper) bounds on the greatest distance from person
+        index `person` to anyone in its component, or (None, None) if
+        no reference reaches it.
+
+        Any reference's distance bounds it from below; the distance to a
+        reference plus that reference's eccentricity bounds it from above.
+        """
+        lower, upper = None, None
+        for k in range(len(self.references)):
+            d = self.distances[k * self.n + person]
+            if d == UNREACHED:
+                continue
+            if d == BEYOND:
+                # The exact distance is unknown, but at least BEYOND
+                lower = BEYOND if lower is None else max(lower, BEYOND)
+                continue
+            if lower is None or d > lower:
+                lower = d
+            if upper is None or d + self.eccentricities[k] < upper:
+                upper = d + self.eccentricities[k]
+        return lower, upper
+
+
+def multi_source_bfs(graph, sources):
+    """
+    Breadth-first search from up to WORD_BITS person indices at once.
+
+    Bit `k` of a person's word is set once source `k` has reached them,
+    so a whole layer for every source costs one pass over the movies
+    touched by that layer. Returns a bytearray of one row of distances
+    per source (UNREACHED where it cannot reach, BEYOND where it is that
+    far or farther) and, per source, a list counting the people at each
+    exact distance.
+    """
+    if len(sources) > WORD_BITS:
+        raise ValueError(f"at most {WORD_BITS} sources per search")
+    n = len(graph.person_ids)
+    distances = bytearray([UNREACHED]) * (n * len(sources))
+    histograms = [[1] for _ in sources]
+
+    visited = array("Q", bytes(8 * n))
+    frontier = {}
+    for k, source in enumerate(sources):
+        bit = 1 << k
+        visited[source] |= bit
+        frontier[source] = frontier.get(source, 0) | bit
+        distances[k * n + source] = 0
+
+    depth = 0
+    while frontier:
+        depth += 1
+
+        # Gather which sources arrive at each movie in this layer
+        movie_bits = {}
+        for person, bits in frontier.items():
+            for movie in graph.movies_of(person):
+                movie_bits[movie] = movie_bits.get(movie, 0) | bits
+
+        next_frontier = {}
+        for movie, bits in movie_bits.items():
+            for neighbor in graph.stars_of(movie):
+                new = bits & ~visited[neighbor]
+                if new:
+                    visited[neighbor] |= new
+                    next_frontier[neighbor] = (
+                        next_frontier.get(neighbor, 0) | new
+                    )
+
+        for person, bits in next_frontier.items():
+            while bits:
+                low = bits & -bits
+                k = low.bit_length() - 1
+                distances[k * n + person] = min(depth, BEYOND)
+                histogram = histograms[k]
+                if len(histogram) == depth:
+                    histogram.append(0)
+                histogram[depth] += 1
+                bits ^= low
+        frontier = next_frontier
+    return distances, histograms
+
+
+def batch_distances_and_histograms(sources):
+    """
+    Run one multi-source search in the graph of a landmarks worker.
+    """
+    return multi_source_bfs(landmarks.worker_graph, sources)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute separation statistics against reference people."
+    )
+    parser.add_argument("directory", help="dataset directory")
+    parser.add_argument("references", nargs="*",
+                        help="reference person_ids (default: best connected)")
+    parser.add_argument("-k", type=int, default=REFERENCES,
+                        help="number of best-connected references to use")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    graph = load_graph(args.directory)
+    if args.references:
+        references = [graph.person_index(r) for r in args.references]
+    else:
+        references = choose_landmarks(graph, args.k)
+
+    print(f"Searching from {len(references)} references...")
+    stats = SeparationStats.build(args.directory, references, args.processes)
+    stats.save(args.directory)
+    print(f"Saved {os.path.join(args.directory, ANALYTICS_FILE)}.")
+
+    total = stats.histogram()
+    reached = sum(total[1:])
+    if reached:
+        mean = sum(d * count for d, count in enumerate(total)) / reached
+        print(f"Mean degrees of separation: {mean:.2f}")
+    print(f"Diameter is at least {max(stats.eccentricities, default=0)}")
+    for d, count in enumerate(total):
+        print(f"{d:3}  {count}")
+
+
+if __name__ == "__main__":
+    main()
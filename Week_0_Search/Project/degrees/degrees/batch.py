@@ -0,0 +1,199 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+import time
+
+import degrees
+
+# Seconds between progress reports
+REPORT_INTERVAL = 5
+
+# Queries handed to a worker at a time
+CHUNK_SIZE = 256
+
+# shortest_path method used by worker processes
+search_method = "bidirectional"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees of separation queries at once."
+    )
+    parser.add_argument("directory", help="dataset directory")
+    parser.add_argument(
+        "queries",
+        help="CSV file of source,target pairs (names or person ids)"
+    )
+    parser.add_argument("-o", "--output", help="output file (default stdout)")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"],
+                        default="csv")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("-m", "--method", default="bidirectional",
+                        choices=["bfs", "bidirectional", "hyperedge"],
+                        help="shortest_path search method")
+    args = parser.parse_args()
+
+    # Load (and snapshot) the graph once before starting any workers
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, indexed=True)
+    print("Data loaded.", file=sys.stderr)
+
+    output = open(args.output, "w", newline="", encoding="utf-8") \
+        if args.output else sys.stdout
+    with open(args.queries, encoding="utf-8", newline="") as f:
+        queries = read_queries(f)
+        try:
+            count, elapsed = run(
+                queries, args.directory, args.method,
+                args.processes, args.format, output
+            )
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+    rate = count / elapsed if elapsed else 0
+    print(f"{count} queries in {elapsed:.2f}s ({rate:.1f} queries/s)",
+          file=sys.stderr)
+
+
+def read_queries(f):
+    """
+    Yield (source, target, error) triples from a CSV file, skipping blank
+    rows and a leading "source,target" header. `error` is None, or says
+    why a row is not a source,target pair, so it is reported as that
+    query's result rather than stopping the batch.
+    """
+    reader = csv.reader(f)
+    line = 1
+    for i, row in enumerate(reader):
+        # A quoted field may span lines; report the row's first
+        first, line = line, reader.line_num + 1
+        if not row or not any(field.strip() for field in row):
+            continue
+        if len(row) != 2:
+            yield (",".join(row), "",
+                   f"line {first}: expected source,target")
+            continue
+        if i == 0 and [field.strip().lower() for field in row] == [
+            "source", "target"
+        ]:
+            continue
+        yield row[0].strip(), row[1].strip(), None
+
+
+def run(queries, directory, method, processes, output_format, output):
+    """
+    Answer every query from read_queries on a pool of worker processes,
+    streaming results to `output` in input order.
+    Returns the number of queries answered and the seconds taken.
+    """
+    writer = RESULT_WRITERS[output_format](output)
+    start = time.perf_counter()
+    last_report = start
+    count = 0
+    with multiprocessing.Pool(
+        processes, initializer=init_worker, initargs=(directory, method)
+    ) as pool:
+        for result in pool.imap(answer, queries, CHUNK_SIZE):
+            writer(result)
+            count += 1
+            now = time.perf_counter()
+            if now - last_report >= REPORT_INTERVAL:
+                print(f"{count} queries ({count / (now - start):.1f}/s)",
+                      file=sys.stderr)
+                last_report = now
+    return count, time.perf_counter() - start
+
+
+def init_worker(directory, method):
+    """
+    Load the graph in a worker process.
+    The snapshot written by the parent is memory-mapped read-only,
+    so every worker shares the same pages of the graph.
+    """
+    global search_method
+    search_method = method
+    degrees.load_data(directory, indexed=True)
+
+
+def answer(query):
+    """
+    Answer one query, returning a dictionary with the resolved
+    source and target, the degrees and path, or an error.
+    """
+    source, target, error = query
+    result = {"source": source, "target": target,
+              "degrees": None, "path": None, "error": error}
+    if error is not None:
+        return result
+    try:
+        source_id = resolve_person(source)
+        target_id = resolve_person(target)
+    except LookupError as e:
+        result["error"] = str(e)
+        return result
+
+    result["source"], result["target"] = source_id, target_id
+    path = degrees.shortest_path(source_id, target_id, method=search_method)
+    if path is None:
+        result["error"] = "Not connected."
+    else:
+        result["degrees"] = len(path)
+        result["path"] = path
+    return result
+
+
+def resolve_person(text):
+    """
+    Return the person_id for `text`, which may be a person_id or
+    an unambiguous name. Raises LookupError otherwise.
+    """
+    if text in degrees.people:
+        return text
+    person_ids = degrees.names.get(text.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    if not person_ids:
+        raise LookupError(f"Person not found: {text}")
+    raise LookupError(f"Ambiguous name: {text}")
+
+
+def csv_writer(output):
+    """
+    Return a function writing results as CSV rows, with each path
+    written as space-separated movie_id:person_id steps.
+    """
+    writer = csv.writer(output)
+    writer.writerow(["source", "target", "degrees", "path", "error"])
+
+    def write(result):
+        path = result["path"]
+        writer.writerow([
+            result["source"], result["target"],
+            "" if result["degrees"] is None else result["degrees"],
+            "" if path is None else " ".join(f"{m}:{p}" for m, p in path),
+            result["error"] or ""
+        ])
+    return write
+
+
+def jsonl_writer(output):
+    """
+    Return a function writing results as JSON lines.
+    """
+    def write(result):
+        output.write(json.dumps(result) + "\n")
+    return write
+
+
+RESULT_WRITERS = {
+    "csv": csv_writer,
+    "jsonl": jsonl_writer
+}
+
+
+if __name__ == "__main__":
+    main()
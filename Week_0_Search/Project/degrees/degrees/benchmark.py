@@ -0,0 +1,215 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+import degrees
+from graph import SNAPSHOT_FILE, load_graph
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; memory peaks are then reported as null
+    resource = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading and searching a degrees dataset."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("directory", help="dataset directory")
+    run_parser.add_argument("-o", "--output", help="write JSON results here")
+    run_parser.add_argument("-n", "--queries", type=int, default=200,
+                            help="random pairs per search method")
+    run_parser.add_argument("-m", "--methods", nargs="+",
+                            default=["bidirectional", "hyperedge"])
+    run_parser.add_argument("--dict", action="store_true",
+                            help="also time the dictionary loader")
+    run_parser.add_argument("--seed", type=int, default=0)
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare two JSON result files"
+    )
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.before) as f:
+            before = json.load(f)
+        with open(args.after) as f:
+            after = json.load(f)
+        for line in compare(before, after):
+            print(line)
+        return
+
+    results = run(args.directory, args.queries, args.methods,
+                  args.dict, args.seed)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+def run(directory, queries, methods, include_dict=False, seed=0):
+    """
+    Benchmark the dataset in `directory` and return a dictionary of results.
+    Each loader runs in a fresh process so its time and memory peak
+    are measured in isolation.
+    """
+    results = {
+        "dataset": os.path.abspath(directory),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "load": {},
+        "queries": {}
+    }
+
+    # Parse the CSVs, then load the snapshot that parse wrote
+    snapshot = os.path.join(directory, SNAPSHOT_FILE)
+    if os.path.exists(snapshot):
+        os.remove(snapshot)
+    loaders = ["csv", "snapshot"] + (["dict"] if include_dict else [])
+    for loader in loaders:
+        results["load"][loader] = isolated(measure_load, directory, loader)
+
+    degrees.load_data(directory, indexed=True)
+    graph = degrees.graph
+    results["people"] = len(graph.person_ids)
+    results["movies"] = len(graph.movie_ids)
+    results["stars"] = len(graph.person_movies)
+
+    rng = random.Random(seed)
+    n = len(graph.person_ids)
+    people = [graph.person_ids[rng.randrange(n)] for _ in range(queries)]
+    results["queries"]["neighbors_for_person"] = timed(
+        degrees.neighbors_for_person, [(person,) for person in people]
+    )
+
+    pairs = [
+        (graph.person_ids[rng.randrange(n)], graph.person_ids[rng.randrange(n)])
+        for _ in range(queries)
+    ]
+    for method in methods:
+        results["queries"][method] = timed(
+            lambda source, target: degrees.shortest_path(
+                source, target, method=method
+            ),
+            pairs
+        )
+    return results
+
+
+def measure_load(directory, loader):
+    """
+    Load the dataset with `loader` ("csv", "snapshot" or "dict") and
+    return its wall time and the process's peak resident memory.
+    """
+    start = time.perf_counter()
+    if loader == "dict":
+        degrees.load_data(directory)
+    else:
+        load_graph(directory, snapshot=(loader == "snapshot"))
+        if loader == "csv":
+            # Write the snapshot outside the timed region
+            elapsed = time.perf_counter() - start
+            load_graph(directory)
+            return {"seconds": elapsed, "peak_rss_mb": peak_rss()}
+    return {"seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss()}
+
+
+def peak_rss():
+    """
+    Return this process's peak resident memory in megabytes, or None.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def isolated(function, *args):
+    """
+    Call `function(*args)` in a new process and return its result.
+    The process is not a daemon, so the function may start its own.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=send_result, args=(sender, function, args)
+    )
+    process.start()
+    sender.close()
+    try:
+        return receiver.recv()
+    except EOFError:
+        raise Exception(f"{function.__name__} failed in its process")
+    finally:
+        process.join()
+
+
+def send_result(connection, function, args):
+    """
+    Send the result of `function(*args)` through `connection`.
+    """
+    connection.send(function(*args))
+    connection.close()
+
+
+def timed(function, calls):
+    """
+    Call `function` once per argument tuple in `calls` and return
+    latency statistics in milliseconds.
+    """
+    latencies = []
+    for args in calls:
+        start = time.perf_counter()
+        function(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": percentile(latencies, 0.5),
+        "p90_ms": percentile(latencies, 0.9),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1]
+    }
+
+
+def percentile(ordered, q):
+    """
+    Return the `q` quantile of the sorted list `ordered`.
+    """
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def compare(before, after):
+    """
+    Yield lines comparing every metric present in both result
+    dictionaries, with the after/before ratio.
+    """
+    for section in ["load", "queries"]:
+        for name in sorted(set(before[section]) & set(after[section])):
+            for metric, old in before[section][name].items():
+                new = after[section][name].get(metric)
+                if not isinstance(old, (int, float)) or new is None:
+                    continue
+                ratio = f"{new / old:.2f}x" if old else "n/a"
+                yield (f"{section}.{name}.{metric}: "
+                       f"{old:.3f} -> {new:.3f} ({ratio})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import sys
+from array import array
+
+from graph import load_graph, load_index, save_index
+
+COMPONENTS_FILE = "components.snapshot"
+
+
+class ComponentIndex():
+
+    def __init__(self, labels, sizes):
+        """
+        Create a connected-component index of the co-star graph.
+        Person index `p` belongs to component `labels[p]`, and component
+        `c` has `sizes[c]` people. Components are numbered from 0 in order
+        of their lowest person index.
+        """
+        self.labels = labels
+        self.sizes = sizes
+
+    @classmethod
+    def build(cls, graph):
+        """
+        Label the components of `graph` with a union-find over the
+        stars of each movie.
+        """
+        n = len(graph.person_ids)
+        parent = array("i", range(n))
+
+        def root(person):
+            # Path halving keeps the trees shallow without recursion
+            while parent[person] != person:
+                parent[person] = parent[parent[person]]
+                person = parent[person]
+            return person
+
+        for movie in range(len(graph.movie_ids)):
+            stars = graph.stars_of(movie)
+            if len(stars) < 2:
+                continue
+            first = root(stars[0])
+            for star in stars[1:]:
+                other = root(star)
+                if other != first:
+                    # Attach the higher root under the lower one
+                    if other < first:
+                        first, other = other, first
+                    parent[other] = first
+
+        labels = array("i", bytes(4 * n))
+        sizes = array("q")
+        for person in range(n):
+            top = root(person)
+            if top == person:
+                labels[person] = len(sizes)
+                sizes.append(0)
+            else:
+                labels[person] = labels[top]
+            sizes[labels[person]] += 1
+        return cls(labels, sizes)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Memory-map the component labels and sizes saved for `directory`,
+        or return None if they are missing or stale.
+        """
+        sections = load_index(directory, COMPONENTS_FILE, "components")
+        if sections is None:
+            return None
+        return cls(sections["labels"], sections["sizes"])
+
+    def save(self, directory):
+        """
+        Save the labels and sizes for `directory`.
+        """
+        save_index(directory, COMPONENTS_FILE, "components",
+                   {"labels": self.labels, "sizes": self.sizes})
+
+    def connected(self, source, target):
+        """
+        Return True if person indices `source` and `target` are connected.
+        """
+        return self.labels[source] == self.labels[target]
+
+    def component_size(self, person):
+        """
+        Return the number of people in the component of person index
+        `person`, including the person.
+        """
+        return self.sizes[self.labels[person]]
+
+    def largest(self, k):
+        """
+        Return the `k` largest component sizes, largest first.
+        """
+        return sorted(self.sizes, reverse=True)[:k]
+
+
+def load_components(directory, graph):
+    """
+    Load the component index for `directory`, building and saving it
+    from `graph` if it is missing or stale.
+    """
+    index = ComponentIndex.load(directory)
+    if index is not None:
+        return index
+    index = ComponentIndex.build(graph)
+    try:
+        index.save(directory)
+    except OSError:
+        pass
+    return index
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python components.py directory")
+    directory = sys.argv[1]
+
+    graph = load_graph(directory)
+    index = load_components(directory, graph)
+    sizes = index.sizes
+    print(f"{len(sizes)} components over {len(graph.person_ids)} people.")
+    print(f"Largest: {', '.join(str(size) for size in index.largest(10))}")
+    print(f"Isolated people: {sum(1 for size in sizes if size == 1)}")
+
+
+if __name__ == "__main__":
+    main()
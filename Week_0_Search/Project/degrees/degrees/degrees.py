@@ -1,6 +1,10 @@
 import csv
 import sys
 
+import search
+from components import load_components
+from graph import load_graph
+from nameindex import NameIndex
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,11 +16,38 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed graph store, when loaded with `indexed=True`
+graph = None
 
-def load_data(directory):
+# Connected components of the graph, when loaded with `components=True`
+component_index = None
+
+# Name index over the graph, built on first use
+name_index = None
+
+
+def load_data(directory, indexed=False, components=False):
     """
     Load data from CSV files into memory.
+
+    If `indexed` is true, load a compact integer-indexed Graph instead
+    of dictionaries; `names`, `people` and `movies` then become read-only
+    views over it. The Graph is cached as a binary snapshot next to the
+    CSV files and memory-mapped on later runs until a CSV file changes.
+
+    If `components` is true, also load (or build and save) the connected
+    components of the indexed graph, so shortest_path can answer
+    disconnected queries immediately. This implies `indexed`.
     """
+    global graph, component_index, names, people, movies
+    if indexed or components:
+        graph = load_graph(directory)
+        names, people, movies = graph.names, graph.people, graph.movies
+        component_index = (
+            load_components(directory, graph) if components else None
+        )
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -45,11 +76,9 @@ def load_data(directory):
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            try:
+            if row["person_id"] in people and row["movie_id"] in movies:
                 people[row["person_id"]]["movies"].add(row["movie_id"])
                 movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
 
 
 def main():
@@ -60,7 +89,7 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, indexed=True, components=True)
     print("Data loaded.")
     
     source = person_id_for_name(input("Name: "))
@@ -87,13 +116,36 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, method="bfs", constraints=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    `method` is "bfs" for a breadth-first search from the source,
+    "bidirectional" to search from both ends of the indexed graph, or
+    "hyperedge" to expand each movie of the indexed graph only once.
+
+    `constraints` optionally restricts the movies a path may use, either
+    as a list of predicates (see year_between and title_not_in), compiled
+    into a mask over the indexed movies on every call, or as a mask
+    returned by compile_constraints, which repeated queries should reuse.
+    Constrained "bfs" runs as "hyperedge".
+
     If no possible path, returns None.
     """
+    if component_index is not None and not component_index.connected(
+        graph.person_index(source), graph.person_index(target)
+    ):
+        return None
+
+    if constraints is not None:
+        return indexed_path(
+            source, target, "hyperedge" if method == "bfs" else method,
+            compile_constraints(constraints)
+        )
+    if method != "bfs":
+        return indexed_path(source, target, method)
+
     BFS_paths = []
     visited = []
     start = Node(state = source, parent = None, action = None)
@@ -123,6 +175,123 @@ def shortest_path(source, target):
                 
     return None
 
+def indexed_path(source, target, method, allowed=None):
+    """
+    Runs the search named by `method` over the integer-indexed graph,
+    using only the movies set in the mask `allowed` if given,
+    and translates its path back to (movie_id, person_id) pairs.
+    """
+    searches = {
+        "bidirectional": search.bidirectional,
+        "hyperedge": search.hyperedge
+    }
+    if method not in searches:
+        raise ValueError(f"unknown search method {method}")
+    require_graph(f"{method} search")
+    path = searches[method](
+        graph, graph.person_index(source), graph.person_index(target),
+        allowed=allowed
+    )
+    if path is None:
+        return None
+    return [
+        (graph.movie_ids[movie], graph.person_ids[person])
+        for movie, person in path
+    ]
+
+
+def count_shortest_paths(source, target, constraints=None):
+    """
+    Returns (degrees, count): the length of the shortest connections
+    between two people and how many distinct ones there are,
+    or (None, 0) if they are not connected.
+    Requires load_data(directory, indexed=True).
+    """
+    require_graph("path counting")
+    return search.count_shortest_paths(
+        graph, graph.person_index(source), graph.person_index(target),
+        allowed=None if constraints is None
+        else compile_constraints(constraints)
+    )
+
+
+def all_shortest_paths(source, target, limit=100, constraints=None):
+    """
+    Yields up to `limit` of the shortest lists of (movie_id, person_id)
+    pairs that connect the source to the target, generated on demand.
+    Requires load_data(directory, indexed=True).
+    """
+    require_graph("path enumeration")
+    for path in search.shortest_paths(
+        graph, graph.person_index(source), graph.person_index(target),
+        limit=limit,
+        allowed=None if constraints is None
+        else compile_constraints(constraints)
+    ):
+        yield [
+            (graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in path
+        ]
+
+
+def require_graph(feature, components=False):
+    """
+    Raises an exception unless the integer-indexed graph is loaded,
+    along with the component index if `components` is True.
+    """
+    if components and component_index is None:
+        raise Exception(
+            f"{feature} requires load_data(directory, components=True)"
+        )
+    if graph is None:
+        raise Exception(
+            f"{feature} requires load_data(directory, indexed=True)"
+        )
+
+
+def compile_constraints(constraints):
+    """
+    Returns a mask with one byte per indexed movie, set for the movies
+    every predicate in `constraints` accepts. A mask is returned as is.
+    Compile once and pass the mask to run many queries under the same
+    constraints. Requires load_data(directory, indexed=True).
+    """
+    if isinstance(constraints, (bytes, bytearray, memoryview)):
+        return constraints
+    require_graph("constraint compilation")
+    return graph.movie_mask(tuple(constraints))
+
+
+def year_between(first, last):
+    """
+    Returns a constraint allowing movies released from year `first`
+    to year `last` inclusive.
+    """
+    def allowed(movie):
+        return movie["year"].isdigit() and first <= int(movie["year"]) <= last
+    return allowed
+
+
+def title_not_in(titles):
+    """
+    Returns a constraint excluding movies with any of the given titles.
+    """
+    titles = {title.lower() for title in titles}
+
+    def allowed(movie):
+        return movie["title"].lower() not in titles
+    return allowed
+
+
+def component_size(person_id):
+    """
+    Returns the number of people connected to a given person,
+    including themselves. Requires load_data(..., components=True).
+    """
+    require_graph("component sizing", components=True)
+    return component_index.component_size(graph.person_index(person_id))
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -149,11 +318,30 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_name(name, limit=10, max_distance=2):
+    """
+    Returns up to `limit` IMDB ids a name may refer to, without prompting:
+    exact matches, then names starting with `name`, then names within
+    `max_distance` edits, each most prolific first.
+    Requires load_data(directory, indexed=True).
+    """
+    global name_index
+    require_graph("name lookup")
+    if name_index is None or name_index.graph is not graph:
+        name_index = NameIndex(graph)
+    return [
+        graph.person_ids[person]
+        for person in name_index.candidates(name, limit, max_distance)
+    ]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,645 @@
+import bisect
+import csv
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+
+# stars.csv files smaller than this many bytes per worker are read serially
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# Id dictionaries held by each stars parsing worker process
+stars_people = None
+stars_movies = None
+
+# Bump whenever the layout of the snapshot file changes
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FILE = "degrees.snapshot"
+SNAPSHOT_MAGIC = b"DEGSNAP\0"
+SOURCE_FILES = ["people.csv", "movies.csv", "stars.csv"]
+
+
+class StringTable(Sequence):
+
+    def __init__(self, blob, offsets):
+        """
+        Compact read-only list of strings.
+        String `i` is the UTF-8 text `blob[offsets[i]:offsets[i + 1]]`.
+        """
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        """
+        Build a StringTable out of an iterable of strings.
+        """
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = array("q", [0])
+        offsets.extend(itertools.accumulate(len(b) for b in encoded))
+        return cls(b"".join(encoded), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class Graph():
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies,
+                 movie_offsets, movie_people, name_order):
+        """
+        Create a co-star graph whose IMDB ids are interned to dense integers.
+
+        Person `i` has id `person_ids[i]` and starred in the movies
+        `person_movies[person_offsets[i]:person_offsets[i + 1]]`;
+        movie `j` has id `movie_ids[j]` and its stars are
+        `movie_people[movie_offsets[j]:movie_offsets[j + 1]]`.
+        Ids are sorted so they can be found by bisection, and `name_order`
+        lists person indices sorted by lowercase name.
+        """
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.name_order = name_order
+
+        # Snapshot file backing the arrays, if memory-mapped
+        self.path = None
+
+        # Dictionary-shaped views so callers can keep using
+        # people[person_id]["name"], movies[movie_id]["stars"] and names[name]
+        self.people = PeopleView(self)
+        self.movies = MoviesView(self)
+        self.names = NamesView(self)
+
+        # Lowercase names in `name_order`, for bisection
+        self.sorted_names = SortedNames(self)
+
+    @classmethod
+    def from_snapshot(cls, path, stamp):
+        """
+        Memory-map the graph snapshot at `path`.
+        Returns None if it is missing, from another snapshot version
+        or not built from CSV files matching `stamp`.
+        """
+        sections = read_sections(path, "graph", stamp)
+        if sections is None:
+            return None
+        graph = cls(*[
+            StringTable(sections[f"{name}.blob"], sections[f"{name}.offsets"])
+            if f"{name}.blob" in sections else sections[name]
+            for name in GRAPH_FIELDS
+        ])
+        graph.path = path
+        return graph
+
+    def save(self, path, stamp):
+        """
+        Write the graph to a snapshot file at `path`, tagged with the
+        `stamp` of the CSV files it was built from.
+        """
+        sections = {}
+        for name in GRAPH_FIELDS:
+            value = getattr(self, name)
+            if isinstance(value, StringTable):
+                sections[f"{name}.blob"] = value.blob
+                sections[f"{name}.offsets"] = value.offsets
+            else:
+                sections[name] = value
+        write_sections(path, "graph", stamp, sections)
+
+    @classmethod
+    def from_csv(cls, directory, processes=None):
+        """
+        Load a graph from the people, movies and stars CSV files
+        in `directory`, parsing a large stars.csv on `processes` worker
+        processes (default: one per CPU).
+        """
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            rows = sorted(
+                (row["id"], row["name"], row["birth"])
+                for row in csv.DictReader(f)
+            )
+        person_ids = StringTable.from_strings(row[0] for row in rows)
+        person_names = StringTable.from_strings(row[1] for row in rows)
+        person_births = StringTable.from_strings(row[2] for row in rows)
+        people = {row[0]: i for i, row in enumerate(rows)}
+        del rows
+
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            rows = sorted(
+                (row["id"], row["title"], row["year"])
+                for row in csv.DictReader(f)
+            )
+        movie_ids = StringTable.from_strings(row[0] for row in rows)
+        movie_titles = StringTable.from_strings(row[1] for row in rows)
+        movie_years = StringTable.from_strings(row[2] for row in rows)
+        movies = {row[0]: j for j, row in enumerate(rows)}
+        del rows
+
+        edge_people, edge_movies = read_stars(
+            f"{directory}/stars.csv", people, movies, processes
+        )
+        del people, movies
+
+        return cls.from_edges(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            edge_people, edge_movies
+        )
+
+    @classmethod
+    def from_edges(cls, person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   edge_people, edge_movies):
+        """
+        Build a graph out of interned columns and parallel arrays of
+        (person index, movie index) star edges.
+        """
+        person_offsets, person_movies = compress(
+            len(person_ids), edge_people, edge_movies
+        )
+        movie_offsets, movie_people = compress(
+            len(movie_ids), edge_movies, edge_people
+        )
+        name_order = array("i", sorted(
+            range(len(person_names)), key=lambda i: person_names[i].lower()
+        ))
+        return cls(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            person_offsets, person_movies,
+            movie_offsets, movie_people, name_order
+        )
+
+    def person_index(self, person_id):
+        """
+        Return the dense index of `person_id`, raising KeyError if unknown.
+        """
+        i = find(self.person_ids, person_id)
+        if i < 0:
+            raise KeyError(person_id)
+        return i
+
+    def movie_index(self, movie_id):
+        """
+        Return the dense index of `movie_id`, raising KeyError if unknown.
+        """
+        i = find(self.movie_ids, movie_id)
+        if i < 0:
+            raise KeyError(movie_id)
+        return i
+
+    def movies_of(self, person):
+        """
+        Return the movie indices person index `person` starred in.
+        """
+        return self.person_movies[
+            self.person_offsets[person]:self.person_offsets[person + 1]
+        ]
+
+    def stars_of(self, movie):
+        """
+        Return the person indices starring in movie index `movie`.
+        """
+        return self.movie_people[
+            self.movie_offsets[movie]:self.movie_offsets[movie + 1]
+        ]
+
+    def movie_mask(self, predicates):
+        """
+        Compile movie predicates into a bytearray with one byte per movie
+        index: 1 if every predicate accepts the movie, 0 otherwise.
+        Each predicate is called with a dictionary of: id, title, year.
+        """
+        mask = bytearray(len(self.movie_ids))
+        for j in range(len(mask)):
+            movie = {
+                "id": self.movie_ids[j],
+                "title": self.movie_titles[j],
+                "year": self.movie_years[j]
+            }
+            mask[j] = all(predicate(movie) for predicate in predicates)
+        return mask
+
+    def people_named(self, name):
+        """
+        Return the person indices whose lowercase name is `name.lower()`.
+        """
+        name = name.lower()
+        lo = bisect.bisect_left(self.sorted_names, name)
+        hi = bisect.bisect_right(self.sorted_names, name, lo=lo)
+        return self.name_order[lo:hi]
+
+    def lowercase_name(self, person):
+        """
+        Return the lowercase name of person index `person`.
+        """
+        return self.person_names[person].lower()
+
+    def neighbors(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for movie in self.movies_of(self.person_index(person_id)):
+            movie_id = self.movie_ids[movie]
+            for person in self.stars_of(movie):
+                neighbors.add((movie_id, self.person_ids[person]))
+        return neighbors
+
+
+# Constructor arguments of Graph, in order, as stored in a snapshot
+GRAPH_FIELDS = [
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years",
+    "person_offsets", "person_movies",
+    "movie_offsets", "movie_people", "name_order"
+]
+
+
+class PeopleView(Mapping):
+
+    def __init__(self, graph):
+        """
+        Map person_ids to a dictionary of: name, birth, movies.
+        """
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        i = graph.person_index(person_id)
+        return {
+            "name": graph.person_names[i],
+            "birth": graph.person_births[i],
+            "movies": {graph.movie_ids[m] for m in graph.movies_of(i)}
+        }
+
+    def __contains__(self, person_id):
+        return find(self.graph.person_ids, person_id) >= 0
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+
+    def __init__(self, graph):
+        """
+        Map movie_ids to a dictionary of: title, year, stars.
+        """
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        j = graph.movie_index(movie_id)
+        return {
+            "title": graph.movie_titles[j],
+            "year": graph.movie_years[j],
+            "stars": {graph.person_ids[p] for p in graph.stars_of(j)}
+        }
+
+    def __contains__(self, movie_id):
+        return find(self.graph.movie_ids, movie_id) >= 0
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class NamesView(Mapping):
+
+    def __init__(self, graph):
+        """
+        Map lowercase names to a set of corresponding person_ids.
+        """
+        self.graph = graph
+
+    def __getitem__(self, name):
+        graph = self.graph
+        person_ids = {graph.person_ids[i] for i in graph.people_named(name)}
+        if not person_ids:
+            raise KeyError(name)
+        return person_ids
+
+    def __iter__(self):
+        graph = self.graph
+        previous = None
+        for i in graph.name_order:
+            name = graph.lowercase_name(i)
+            if name != previous:
+                yield name
+                previous = name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class SortedNames(Sequence):
+
+    def __init__(self, graph):
+        """
+        Read-only list of the lowercase names of the people in
+        `graph.name_order`, computed on access. Bisecting it finds people
+        by name without the `key` argument bisect gained in Python 3.10.
+        """
+        self.graph = graph
+
+    def __len__(self):
+        return len(self.graph.name_order)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self.graph.lowercase_name(self.graph.name_order[i])
+
+
+def read_stars(path, people, movies, processes=None):
+    """
+    Read a stars.csv file into parallel arrays of person and movie indices,
+    given dictionaries mapping ids to indices. Rows referencing unknown
+    people or movies are dropped.
+
+    Large files are split into byte ranges ending on line boundaries
+    (stars.csv holds only ids, so no field spans lines) and parsed on
+    a pool of worker processes, keeping the rows in file order. Inside
+    a pool worker, which may not start processes of its own, the file is
+    parsed serially.
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+    columns = next(csv.reader([header.decode("utf-8-sig")]))
+    fields = (columns.index("person_id"), columns.index("movie_id"))
+
+    processes = processes or os.cpu_count() or 1
+    if multiprocessing.current_process().daemon:
+        processes = 1
+    chunks = min(processes, (size - start) // CHUNK_BYTES)
+    if chunks < 2:
+        return parse_stars(path, start, size, fields, people, movies)
+
+    # Move each cut forward to the start of the next line
+    cuts = [start]
+    with open(path, "rb") as f:
+        for k in range(1, chunks):
+            f.seek(start + k * (size - start) // chunks)
+            f.readline()
+            cuts.append(max(f.tell(), cuts[-1]))
+    cuts.append(size)
+
+    edge_people = array("i")
+    edge_movies = array("i")
+    with multiprocessing.Pool(
+        chunks, initializer=init_stars_worker, initargs=(people, movies)
+    ) as pool:
+        for chunk_people, chunk_movies in pool.starmap(parse_stars_chunk, [
+            (path, cuts[k], cuts[k + 1], fields) for k in range(chunks)
+        ]):
+            edge_people.extend(chunk_people)
+            edge_movies.extend(chunk_movies)
+    return edge_people, edge_movies
+
+
+def parse_stars(path, start, end, fields, people, movies):
+    """
+    Parse the stars rows in bytes [start, end) of `path` into arrays of
+    person and movie indices, taking the id columns at positions `fields`.
+    """
+    person_field, movie_field = fields
+    edge_people = array("i")
+    edge_movies = array("i")
+    with open(path, "rb") as f:
+        f.seek(start)
+        for row in csv.reader(read_lines(f, end - start)):
+            try:
+                person = people[row[person_field]]
+                movie = movies[row[movie_field]]
+            except (KeyError, IndexError):
+                continue
+            edge_people.append(person)
+            edge_movies.append(movie)
+    return edge_people, edge_movies
+
+
+def read_lines(f, size):
+    """
+    Yield decoded lines from binary file `f` until `size` bytes are read.
+    """
+    for line in f:
+        if size <= 0:
+            break
+        size -= len(line)
+        yield line.decode("utf-8")
+
+
+def init_stars_worker(people, movies):
+    """
+    Keep the id dictionaries in a stars parsing worker process.
+    """
+    global stars_people, stars_movies
+    stars_people, stars_movies = people, movies
+
+
+def parse_stars_chunk(path, start, end, fields):
+    """
+    Parse one byte range of stars.csv in a worker process.
+    """
+    return parse_stars(path, start, end, fields, stars_people, stars_movies)
+
+
+def find(table, key):
+    """
+    Return the index of `key` in the sorted sequence `table`, or -1.
+    """
+    i = bisect.bisect_left(table, key)
+    if i < len(table) and table[i] == key:
+        return i
+    return -1
+
+
+def compress(n, sources, targets):
+    """
+    Group parallel edge arrays by source into compressed sparse rows.
+    Returns (offsets, targets) where the targets of source `i` are
+    `targets[offsets[i]:offsets[i + 1]]`, without duplicates.
+    """
+    counts = array("i", bytes(4 * (n + 1)))
+    for source in sources:
+        counts[source + 1] += 1
+    offsets = array("q", itertools.accumulate(counts))
+
+    # Scatter each edge into its row
+    cursor = array("q", offsets)
+    rows = array("i", bytes(4 * len(sources)))
+    for source, target in zip(sources, targets):
+        rows[cursor[source]] = target
+        cursor[source] += 1
+
+    # Sort rows and drop duplicate edges, as the set-based loader did
+    compact = array("i")
+    offsets_out = array("q", [0])
+    for i in range(n):
+        row = sorted(set(rows[offsets[i]:offsets[i + 1]]))
+        compact.extend(row)
+        offsets_out.append(len(compact))
+    return offsets_out, compact
+
+
+def load_graph(directory, snapshot=True, processes=None):
+    """
+    Load the graph for the CSV files in `directory`.
+
+    If `snapshot` is true, memory-map the binary snapshot kept next to
+    the CSV files when it is still current, and otherwise parse the CSV
+    files (stars.csv on up to `processes` workers) and write a fresh
+    snapshot for the next run.
+    """
+    if not snapshot:
+        return Graph.from_csv(directory, processes)
+
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    stamp = source_stamp(directory)
+    graph = Graph.from_snapshot(path, stamp)
+    if graph is not None:
+        return graph
+
+    graph = Graph.from_csv(directory, processes)
+    try:
+        graph.save(path, stamp)
+    except OSError:
+        # A read-only dataset directory just means no snapshot
+        pass
+    else:
+        graph = Graph.from_snapshot(path, stamp) or graph
+    return graph
+
+
+def source_stamp(directory):
+    """
+    Return the size and modification time of each CSV file in
+    `directory`, which a snapshot must match to be reused.
+    """
+    stamp = {}
+    for filename in SOURCE_FILES:
+        info = os.stat(os.path.join(directory, filename))
+        stamp[filename] = [info.st_size, info.st_mtime_ns]
+    return stamp
+
+
+def save_index(directory, filename, kind, sections):
+    """
+    Write the array `sections` of an index of `kind` to `filename` next
+    to the dataset in `directory`, tagged with the stamp of its CSV files.
+    """
+    write_sections(os.path.join(directory, filename), kind,
+                   source_stamp(directory), sections)
+
+
+def load_index(directory, filename, kind):
+    """
+    Memory-map the sections of the index of `kind` that save_index wrote,
+    or return None if there is none or the dataset has changed since.
+    """
+    return read_sections(os.path.join(directory, filename), kind,
+                         source_stamp(directory))
+
+
+def write_sections(path, kind, stamp, sections):
+    """
+    Write a binary file of named array sections.
+
+    The file starts with a magic number and a JSON header recording
+    `kind`, the snapshot version, `stamp` and where each section lives;
+    sections follow, aligned to 8 bytes, in native byte order.
+    """
+    layout = {}
+    offset = 0
+    for name, value in sections.items():
+        data = memoryview(value)
+        layout[name] = [data.format, offset, data.nbytes]
+        offset += -(-data.nbytes // 8) * 8
+
+    header = json.dumps({
+        "kind": kind,
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "stamp": stamp,
+        "sections": layout
+    }).encode("utf-8")
+    start = -(-(len(SNAPSHOT_MAGIC) + 8 + len(header)) // 8) * 8
+
+    # Write beside the target and rename, so readers never see half a file
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for name, value in sections.items():
+                f.write(bytes(start + layout[name][1] - f.tell()))
+                f.write(memoryview(value).cast("B"))
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def read_sections(path, kind, stamp):
+    """
+    Memory-map a file written by write_sections and return a dictionary
+    of its sections as memoryviews, or None if the file is missing or does
+    not match `kind`, the current snapshot version and `stamp`.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return None
+            length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(length))
+            if (header["kind"] != kind
+                    or header["version"] != SNAPSHOT_VERSION
+                    or header["byteorder"] != sys.byteorder
+                    or header["stamp"] != stamp):
+                return None
+            data = memoryview(
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            )
+
+        start = -(-(len(SNAPSHOT_MAGIC) + 8 + length) // 8) * 8
+        sections = {}
+        for name, (typecode, offset, size) in header["sections"].items():
+            section = data[start + offset:start + offset + size]
+            sections[name] = section.cast(typecode)
+        return sections
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
@@ -0,0 +1,206 @@
+import math
+import multiprocessing
+import os
+import sys
+from array import array
+
+import search
+from graph import load_graph, load_index, save_index
+
+LANDMARKS_FILE = "landmarks.snapshot"
+
+# Distances are stored as bytes; this marks a person a landmark never reaches
+UNREACHED = 255
+
+# Stored for people a landmark reaches in this many degrees or more
+BEYOND = 254
+
+# Number of landmarks built by default
+LANDMARKS = 16
+
+# Graph memory-mapped by each worker process building landmark or
+# analytics distances
+worker_graph = None
+
+
+class LandmarkIndex():
+
+    def __init__(self, landmarks, distances):
+        """
+        Create a landmark distance oracle.
+        `landmarks` lists the person indices searched from, and
+        `distances` holds one byte per (landmark, person): the degrees
+        from landmark `k` to person `p` are `distances[k * n + p]`,
+        UNREACHED, or BEYOND if it is BEYOND or more.
+        """
+        self.landmarks = landmarks
+        self.distances = distances
+        self.n = len(distances) // len(landmarks) if len(landmarks) else 0
+        self.rows = [
+            distances[k * self.n:(k + 1) * self.n]
+            for k in range(len(landmarks))
+        ]
+
+    @classmethod
+    def build(cls, directory, k=LANDMARKS, processes=None):
+        """
+        Build an index over the `k` best-connected people of the dataset
+        in `directory`, running one breadth-first search per landmark
+        on a pool of worker processes.
+        """
+        graph = load_graph(directory)
+        landmarks = array("i", choose_landmarks(graph, k))
+        distances = bytearray()
+        with multiprocessing.Pool(
+            processes, initializer=init_worker, initargs=(directory,)
+        ) as pool:
+            for row in pool.imap(landmark_distances, landmarks):
+                distances.extend(row)
+        return cls(landmarks, distances)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Memory-map the landmark distances saved for `directory`, or
+        return None if they are missing or stale.
+        """
+        sections = load_index(directory, LANDMARKS_FILE, "landmarks")
+        if sections is None:
+            return None
+        return cls(sections["landmarks"], sections["distances"])
+
+    def save(self, directory):
+        """
+        Save the landmarks and their distance rows for `directory`.
+        """
+        save_index(directory, LANDMARKS_FILE, "landmarks",
+                   {"landmarks": self.landmarks, "distances": self.distances})
+
+    def bounds(self, source, target):
+        """
+        Return (lower, upper) bounds on the degrees of separation between
+        person indices `source` and `target`.
+        Both are math.inf when a landmark proves the two are not connected;
+        `upper` is math.inf when no landmark reaches either of them.
+        """
+        if source == target:
+            return 0, 0
+        lower, upper = 1, math.inf
+        for row in self.rows:
+            a, b = row[source], row[target]
+            if a == UNREACHED and b == UNREACHED:
+                continue
+            if a == UNREACHED or b == UNREACHED:
+                return math.inf, math.inf
+            if a == BEYOND or b == BEYOND:
+                # Only a lower bound is known when one of them is that far
+                if a != b:
+                    lower = max(lower, BEYOND - min(a, b))
+                continue
+            lower = max(lower, abs(a - b))
+            upper = min(upper, a + b)
+        return lower, upper
+
+    def distance(self, graph, source, target):
+        """
+        Return the exact degrees of separation between person indices
+        `source` and `target`, or None if they are not connected.
+
+        The landmark bounds answer directly when they meet; otherwise
+        a bidirectional search looks only for paths shorter than the
+        upper bound, falling back to the bound when there are none.
+        """
+        lower, upper = self.bounds(source, target)
+        if lower == math.inf:
+            return None
+        if lower == upper:
+            return lower
+
+        max_depth = None if upper == math.inf else upper - 1
+        path = search.bidirectional(graph, source, target, max_depth)
+        if path is not None:
+            return len(path)
+        return None if upper == math.inf else upper
+
+
+def choose_landmarks(graph, k):
+    """
+    Return the `k` person indices with the most co-star edges.
+    """
+    degree = [
+        sum(
+            graph.movie_offsets[movie + 1] - graph.movie_offsets[movie]
+            for movie in graph.movies_of(person)
+        )
+        for person in range(len(graph.person_ids))
+    ]
+    ranked = sorted(range(len(degree)), key=lambda p: -degree[p])
+    return ranked[:k]
+
+
+def bfs_distances(graph, source):
+    """
+    Return a bytearray of the degrees from person index `source` to
+    every person, with UNREACHED for people it cannot reach and BEYOND
+    for people BEYOND or more degrees away.
+    """
+    distances = bytearray([UNREACHED]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    distances[source] = 0
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for person in frontier:
+            for movie in graph.movies_of(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for neighbor in graph.stars_of(movie):
+                    if distances[neighbor] == UNREACHED:
+                        distances[neighbor] = min(depth, BEYOND)
+                        next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distances
+
+
+def init_worker(directory):
+    """
+    Memory-map the dataset's graph snapshot in a worker process.
+    """
+    global worker_graph
+    worker_graph = load_graph(directory)
+
+
+def landmark_distances(landmark):
+    """
+    Return the distances from `landmark` in the worker's graph.
+    """
+    return bfs_distances(worker_graph, landmark)
+
+
+def separation(graph, index, source_id, target_id):
+    """
+    Returns the degrees of separation between two person_ids,
+    or None if they are not connected.
+    """
+    return index.distance(
+        graph, graph.person_index(source_id), graph.person_index(target_id)
+    )
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python landmarks.py directory [landmarks]")
+    directory = sys.argv[1]
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else LANDMARKS
+
+    print(f"Building {k} landmarks...")
+    index = LandmarkIndex.build(directory, k)
+    index.save(directory)
+    print(f"Saved {os.path.join(directory, LANDMARKS_FILE)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import bisect
+import heapq
+
+# Sorts after every character a name can contain
+END = "\U0010ffff"
+
+
+class NameIndex():
+
+    def __init__(self, graph):
+        """
+        Create a name index over the people of `graph`.
+
+        The index is the graph's `name_order` array of person indices
+        sorted by lowercase name. Ranges of that array sharing a prefix
+        act as the nodes of a trie, so no extra structure is stored.
+        """
+        self.graph = graph
+        self.order = graph.name_order
+        self.names = graph.sorted_names
+        self.key = graph.lowercase_name
+
+    def films(self, person):
+        """
+        Return the number of movies person index `person` starred in.
+        """
+        offsets = self.graph.person_offsets
+        return offsets[person + 1] - offsets[person]
+
+    def span(self, prefix, lo=0, hi=None):
+        """
+        Return the range [lo, hi) of `order` whose names start with `prefix`.
+        """
+        if hi is None:
+            hi = len(self.order)
+        start = bisect.bisect_left(self.names, prefix, lo, hi)
+        end = bisect.bisect_left(self.names, prefix + END, start, hi)
+        return start, end
+
+    def exact(self, name):
+        """
+        Return person indices named `name` (ignoring case),
+        most prolific first.
+        """
+        lo, hi = self.span(name.lower())
+        name = name.lower()
+        people = [
+            person for person in self.order[lo:hi]
+            if self.key(person) == name
+        ]
+        return sorted(people, key=lambda person: -self.films(person))
+
+    def prefix(self, prefix, limit=10):
+        """
+        Return up to `limit` person indices whose names start with
+        `prefix` (ignoring case), most prolific first.
+        """
+        lo, hi = self.span(prefix.lower())
+        return heapq.nsmallest(
+            limit, self.order[lo:hi],
+            key=lambda person: (-self.films(person), self.key(person))
+        )
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Return up to `limit` (distance, person index) pairs for names
+        within `max_distance` edits of `name` (ignoring case),
+        nearest first and then most prolific first.
+
+        Walks the implicit trie of sorted names, carrying one row of the
+        Levenshtein table per prefix and abandoning any prefix whose row
+        is already over `max_distance`.
+        """
+        query = name.lower()
+        matches = []
+        stack = [("", 0, len(self.order), list(range(len(query) + 1)))]
+        while stack:
+            prefix, lo, hi, row = stack.pop()
+            depth = len(prefix)
+            i = lo
+            while i < hi:
+                person = self.order[i]
+                label = self.key(person)
+
+                # The name is the prefix itself
+                if len(label) == depth:
+                    if row[-1] <= max_distance:
+                        matches.append((row[-1], -self.films(person), person))
+                    i += 1
+                    continue
+
+                # Descend into the child range for the next character
+                child = prefix + label[depth]
+                _, end = self.span(child, i, hi)
+                child_row = next_row(row, query, label[depth])
+                if min(child_row) <= max_distance:
+                    stack.append((child, i, end, child_row))
+                i = end
+
+        matches.sort()
+        return [(distance, person) for distance, _, person in matches[:limit]]
+
+    def candidates(self, name, limit=10, max_distance=2):
+        """
+        Return up to `limit` person indices that `name` may refer to:
+        exact matches, then names it is a prefix of, then names within
+        `max_distance` edits, each group most prolific first.
+        """
+        found = []
+        for group in [
+            self.exact(name),
+            self.prefix(name, limit),
+            [person for _, person in self.fuzzy(name, max_distance, limit)]
+        ]:
+            for person in group:
+                if person not in found:
+                    found.append(person)
+        return found[:limit]
+
+
+def next_row(row, query, c):
+    """
+    Return the Levenshtein row for a prefix extended by character `c`,
+    given the row `row` of that prefix against `query`.
+    """
+    result = [row[0] + 1]
+    for j in range(1, len(row)):
+        result.append(min(
+            result[j - 1] + 1,
+            row[j] + 1,
+            row[j - 1] + (query[j - 1] != c)
+        ))
+    return result
@@ -0,0 +1,228 @@
+def bidirectional(graph, source, target, max_depth=None, allowed=None):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect person index `source` to `target` in `graph`,
+    searching from both ends one whole layer at a time and
+    always growing the smaller frontier.
+
+    If `allowed` is given, only movies whose byte in it is set are used.
+
+    If no possible path, or none of at most `max_depth` steps,
+    returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached person to (movie, parent, depth) on its side
+    forward = {source: (None, None, 0)}
+    backward = {target: (None, None, 0)}
+    forward_frontier = [source]
+    backward_frontier = [target]
+    depth = 0
+
+    while forward_frontier and backward_frontier:
+        if max_depth is not None and depth >= max_depth:
+            return None
+        depth += 1
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meet = expand(
+                graph, forward_frontier, forward, backward, allowed
+            )
+        else:
+            backward_frontier, meet = expand(
+                graph, backward_frontier, backward, forward, allowed
+            )
+        if meet is not None:
+            return join(forward, backward, meet)
+
+    return None
+
+
+def hyperedge(graph, source, target, allowed=None):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect person index `source` to `target` in `graph`,
+    treating each movie as one hyperedge between all of its stars.
+
+    Layers alternate people and movies, and every movie is expanded
+    at most once, so no pairwise co-star set is ever built.
+    If `allowed` is given, only movies whose byte in it is set are used.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached person to the (movie, person) it was reached by
+    parents = {source: None}
+    seen_movies = set()
+    frontier = [source]
+
+    while frontier:
+        next_frontier = []
+        for person in frontier:
+            for movie in graph.movies_of(person):
+                if movie in seen_movies:
+                    continue
+                seen_movies.add(movie)
+                if allowed is not None and not allowed[movie]:
+                    continue
+                for neighbor in graph.stars_of(movie):
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = (movie, person)
+                    if neighbor == target:
+                        return trace(parents, target)
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+
+    return None
+
+
+def trace(parents, person):
+    """
+    Follow `parents` back from `person` to the root of the search,
+    returning the (movie, person) path from the root.
+    """
+    path = []
+    while parents[person] is not None:
+        movie, parent = parents[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+    return path
+
+
+def expand(graph, frontier, reached, other, allowed=None):
+    """
+    Expand every person in `frontier` by one layer through the movies
+    `allowed` (or all movies), recording parents in `reached`.
+    Returns the next frontier and the person where the layer
+    met `other` closest to the other side's root, or None.
+    """
+    next_frontier = []
+    meet = None
+    best = None
+    for person in frontier:
+        depth = reached[person][2] + 1
+        for movie in graph.movies_of(person):
+            if allowed is not None and not allowed[movie]:
+                continue
+            for neighbor in graph.stars_of(movie):
+                if neighbor in reached:
+                    continue
+                reached[neighbor] = (movie, person, depth)
+                next_frontier.append(neighbor)
+                if neighbor in other and (
+                    best is None or other[neighbor][2] < best
+                ):
+                    meet, best = neighbor, other[neighbor][2]
+    return next_frontier, meet
+
+
+def join(forward, backward, meet):
+    """
+    Build the (movie, person) path through the person `meet`
+    reached by both searches.
+    """
+    path = []
+    person = meet
+    while forward[person][1] is not None:
+        movie, parent, _ = forward[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+
+    person = meet
+    while backward[person][1] is not None:
+        movie, parent, _ = backward[person]
+        path.append((movie, parent))
+        person = parent
+    return path
+
+
+def count_shortest_paths(graph, source, target, allowed=None):
+    """
+    Returns (degrees, count): the length of the shortest paths from
+    person index `source` to `target` and how many distinct
+    (movie, person) paths have that length, or (None, 0) if there is
+    no path. Paths are counted, never enumerated.
+    """
+    depth, count = layers(graph, source, target, allowed)
+    if target not in depth:
+        return None, 0
+    return depth[target], count[target]
+
+
+def shortest_paths(graph, source, target, limit=None, allowed=None):
+    """
+    Yields every shortest list of (movie, person) index pairs from
+    person index `source` to `target`, at most `limit` of them.
+
+    Paths are built lazily by walking back from the target through
+    people one layer closer to the source, so only the paths
+    actually taken are ever held in memory.
+    """
+    depth, _ = layers(graph, source, target, allowed)
+    if target not in depth or limit == 0:
+        return
+
+    found = 0
+    # Each entry is a person and the reversed path from it to the target
+    stack = [(target, [])]
+    while stack:
+        person, suffix = stack.pop()
+        if person == source:
+            yield suffix[::-1]
+            found += 1
+            if limit is not None and found >= limit:
+                return
+            continue
+        previous = depth[person] - 1
+        for movie in graph.movies_of(person):
+            if allowed is not None and not allowed[movie]:
+                continue
+            for neighbor in graph.stars_of(movie):
+                if depth.get(neighbor) == previous:
+                    stack.append((neighbor, suffix + [(movie, person)]))
+
+
+def layers(graph, source, target, allowed=None):
+    """
+    Breadth-first search from `source` one layer at a time until the
+    layer holding `target` is complete.
+
+    Returns dictionaries mapping each reached person to its depth and
+    to its number of shortest paths from `source`: a movie first
+    expanded from layer d carries the summed counts of its layer-d stars
+    to each of its stars first reached on layer d + 1.
+    """
+    depth = {source: 0}
+    count = {source: 1}
+    frontier = [source]
+    seen_movies = set()
+    d = 0
+    while frontier and target not in depth:
+        # Sum the paths arriving at each movie first expanded from layer d
+        movie_count = {}
+        for person in frontier:
+            for movie in graph.movies_of(person):
+                if movie in seen_movies:
+                    continue
+                if allowed is not None and not allowed[movie]:
+                    continue
+                movie_count[movie] = movie_count.get(movie, 0) + count[person]
+
+        next_frontier = []
+        for movie, paths in movie_count.items():
+            seen_movies.add(movie)
+            for neighbor in graph.stars_of(movie):
+                if neighbor not in depth:
+                    depth[neighbor] = d + 1
+                    count[neighbor] = 0
+                    next_frontier.append(neighbor)
+                if depth[neighbor] == d + 1:
+                    count[neighbor] += paths
+        frontier = next_frontier
+        d += 1
+    return depth, count
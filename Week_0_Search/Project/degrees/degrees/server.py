@@ -0,0 +1,306 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import sys
+import time
+import urllib.parse
+
+import degrees
+
+# Most recent request latencies kept per endpoint for percentiles
+LATENCY_WINDOW = 10000
+
+# Largest request head accepted, in bytes
+MAX_HEAD = 16384
+
+
+class LRUCache():
+
+    def __init__(self, capacity):
+        """
+        Create a least-recently-used cache holding up to `capacity` entries
+        and counting hits and misses.
+        """
+        self.capacity = capacity
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Return (True, value) for a cached key, marking it recently used,
+        or (False, None).
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, self.entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key, value):
+        """
+        Cache `value` under `key`, evicting the least recently used entry
+        when full.
+        """
+        if self.capacity <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Return a dictionary of the cache's size and hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None
+        }
+
+
+class LatencyStats():
+
+    def __init__(self):
+        """
+        Track recent request latencies per endpoint.
+        """
+        self.samples = collections.defaultdict(
+            lambda: collections.deque(maxlen=LATENCY_WINDOW)
+        )
+        self.counts = collections.Counter()
+
+    def record(self, endpoint, seconds):
+        """
+        Record one request to `endpoint` taking `seconds`.
+        """
+        self.samples[endpoint].append(seconds)
+        self.counts[endpoint] += 1
+
+    def stats(self):
+        """
+        Return request counts and p50/p90/p99/max latencies in
+        milliseconds for each endpoint.
+        """
+        result = {}
+        for endpoint, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[endpoint] = {"requests": self.counts[endpoint]}
+            for name, q in [("p50", 0.5), ("p90", 0.9), ("p99", 0.99)]:
+                i = min(len(ordered) - 1, int(q * len(ordered)))
+                result[endpoint][f"{name}_ms"] = ordered[i] * 1000
+            result[endpoint]["max_ms"] = ordered[-1] * 1000
+        return result
+
+
+class DegreesServer():
+
+    def __init__(self, directory, processes=None, cache_size=10000):
+        """
+        Create a server answering degrees queries for the dataset in
+        `directory` on a pool of `processes` worker processes.
+        """
+        self.directory = directory
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            processes, initializer=init_worker, initargs=(directory,)
+        )
+        self.cache = LRUCache(cache_size)
+        self.latency = LatencyStats()
+        self.routes = {
+            "/path": self.path,
+            "/person": self.person,
+            "/stats": self.stats
+        }
+
+    async def handle(self, reader, writer):
+        """
+        Serve one HTTP request on a connection, then close it.
+        """
+        start = time.perf_counter()
+        endpoint = None
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            method, target, _ = head.split(b"\r\n", 1)[0].decode().split(" ")
+            url = urllib.parse.urlsplit(target)
+            query = dict(urllib.parse.parse_qsl(url.query))
+            endpoint = url.path
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                UnicodeDecodeError, ValueError):
+            status, body = 400, {"error": "malformed request"}
+        else:
+            if method != "GET":
+                status, body = 405, {"error": "only GET is supported"}
+            elif endpoint not in self.routes:
+                status, body = 404, {"error": f"no such endpoint {endpoint}"}
+            else:
+                try:
+                    status, body = await self.routes[endpoint](query)
+                except ValueError as e:
+                    status, body = 400, {"error": str(e)}
+                except Exception as e:
+                    status, body = 500, {"error": str(e)}
+
+        data = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n".encode() + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+        if endpoint in self.routes:
+            self.latency.record(endpoint, time.perf_counter() - start)
+
+    async def path(self, query):
+        """
+        GET /path?source=ID&target=ID[&method=M]
+        Returns the degrees and path between two person_ids.
+        """
+        source, target = query.get("source"), query.get("target")
+        method = query.get("method", "bidirectional")
+        if not source or not target:
+            return 400, {"error": "source and target are required"}
+
+        key = (source, target, method)
+        hit, result = self.cache.get(key)
+        if not hit:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self.executor, find_path, source, target, method
+            )
+            self.cache.put(key, result)
+        return (404 if "error" in result else 200), result
+
+    async def person(self, query):
+        """
+        GET /person?name=NAME[&limit=N]
+        Returns people the name may refer to, most likely first.
+        """
+        name = query.get("name")
+        if not name:
+            return 400, {"error": "name is required"}
+        limit = int(query.get("limit", 10))
+        loop = asyncio.get_running_loop()
+        candidates = await loop.run_in_executor(
+            self.executor, find_people, name, limit
+        )
+        return 200, {"name": name, "candidates": candidates}
+
+    async def stats(self, query):
+        """
+        GET /stats
+        Returns latency percentiles and cache statistics.
+        """
+        return 200, {
+            "latency": self.latency.stats(),
+            "cache": self.cache.stats()
+        }
+
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error"
+}
+
+
+def init_worker(directory):
+    """
+    Load the dataset and its components in a request worker process.
+    """
+    degrees.load_data(directory, components=True)
+
+
+def find_path(source, target, method):
+    """
+    Return a JSON-ready result for the path between two person_ids,
+    with null degrees and path if they are not connected.
+    """
+    for person_id in [source, target]:
+        if person_id not in degrees.people:
+            return {"error": f"Person not found: {person_id}"}
+    path = degrees.shortest_path(source, target, method=method)
+    if path is None:
+        return {"source": source, "target": target, "degrees": None,
+                "path": None}
+    return {"source": source, "target": target, "degrees": len(path),
+            "path": path}
+
+
+def find_people(name, limit):
+    """
+    Return JSON-ready candidate people for a name.
+    """
+    candidates = []
+    for person_id in degrees.person_ids_for_name(name, limit):
+        person = degrees.people[person_id]
+        candidates.append({
+            "id": person_id,
+            "name": person["name"],
+            "birth": person["birth"],
+            "movies": len(person["movies"])
+        })
+    return candidates
+
+
+async def serve(server, host, port, unix):
+    """
+    Run `server` on a Unix socket if `unix` is given,
+    otherwise on TCP `host`:`port`.
+    """
+    if unix:
+        listener = await asyncio.start_unix_server(
+            server.handle, unix, limit=MAX_HEAD
+        )
+        print(f"Serving on {unix}", file=sys.stderr)
+    else:
+        listener = await asyncio.start_server(
+            server.handle, host, port, limit=MAX_HEAD
+        )
+        print(f"Serving on http://{host}:{port}", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve degrees of separation queries over HTTP."
+    )
+    parser.add_argument("directory", help="dataset directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix", help="listen on this Unix socket instead")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--cache", type=int, default=10000,
+                        help="number of paths to cache")
+    args = parser.parse_args()
+
+    # Build the snapshot and indexes once, before any worker needs them
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, components=True)
+    print("Data loaded.", file=sys.stderr)
+
+    server = DegreesServer(args.directory, args.processes, args.cache)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
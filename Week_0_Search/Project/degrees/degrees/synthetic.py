@@ -0,0 +1,121 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+
+FIRST_NAMES = [
+    "Emma", "Tom", "Kevin", "Jennifer", "Chris", "Anna", "Robert", "Meryl",
+    "Denzel", "Cate", "Samuel", "Julia", "Morgan", "Scarlett", "Brad", "Viola",
+    "Keanu", "Natalie", "Hugh", "Sandra", "Leonardo", "Nicole", "Will", "Amy"
+]
+LAST_NAMES = [
+    "Watson", "Hanks", "Bacon", "Lawrence", "Evans", "Smith", "Jones",
+    "Streep", "Washington", "Blanchett", "Jackson", "Roberts", "Freeman",
+    "Johansson", "Pitt", "Davis", "Reeves", "Portman", "Jackman", "Bullock",
+    "DiCaprio", "Kidman", "Adams", "Garcia", "Nguyen", "Kim", "Patel"
+]
+TITLE_WORDS = [
+    "Night", "Return", "Last", "City", "Love", "Dark", "Star", "River",
+    "Secret", "Summer", "War", "Dream", "Road", "House", "Lost", "Game"
+]
+
+# Pareto shape and minimum of cast sizes; most casts are small,
+# a few are huge
+CAST_SHAPE = 1.6
+MIN_CAST = 2
+
+# Zipf exponent of how often each person is cast
+POPULARITY_EXPONENT = 0.9
+
+# Largest cast a single movie may have
+MAX_CAST = 500
+
+
+def generate(directory, people, movies=None, seed=None):
+    """
+    Write people.csv, movies.csv and stars.csv to `directory` for a
+    synthetic dataset of `people` people and `movies` movies (default
+    half as many), with power-law cast sizes and person popularity.
+    Returns the number of star rows written.
+    """
+    rng = random.Random(seed)
+    movies = movies if movies is not None else max(1, people // 2)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(people):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            birth = str(rng.randint(1900, 2005)) if rng.random() < 0.8 else ""
+            writer.writerow([person_id(i), name, birth])
+
+    with open(os.path.join(directory, "movies.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for j in range(movies):
+            title = " ".join(rng.sample(TITLE_WORDS, rng.randint(1, 3)))
+            writer.writerow([movie_id(j), title, rng.randint(1920, 2020)])
+
+    # Person i is cast with weight 1 / (i + 1) ** exponent, shuffled
+    # so popularity is unrelated to id order
+    ranks = list(range(people))
+    rng.shuffle(ranks)
+    weights = itertools.accumulate(
+        1 / (rank + 1) ** POPULARITY_EXPONENT for rank in ranks
+    )
+    cumulative = list(weights)
+
+    rows = 0
+    with open(os.path.join(directory, "stars.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        population = range(people)
+        for j in range(movies):
+            size = min(
+                MAX_CAST, people,
+                int(MIN_CAST * rng.paretovariate(CAST_SHAPE))
+            )
+            cast = set(rng.choices(population, cum_weights=cumulative, k=size))
+            for i in cast:
+                writer.writerow([person_id(i), movie_id(j)])
+            rows += len(cast)
+    return rows
+
+
+def person_id(i):
+    """
+    Return the IMDB-style id of synthetic person `i`.
+    """
+    return str(100 + i)
+
+
+def movie_id(j):
+    """
+    Return the IMDB-style id of synthetic movie `j`.
+    """
+    return str(1000000 + j)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic IMDB-like dataset for degrees.py."
+    )
+    parser.add_argument("directory", help="directory to write CSV files to")
+    parser.add_argument("people", type=int, help="number of people")
+    parser.add_argument("--movies", type=int, default=None,
+                        help="number of movies (default: people / 2)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    rows = generate(args.directory, args.people, args.movies, args.seed)
+    print(f"Wrote {args.people} people and {rows} star rows "
+          f"to {args.directory}.")
+
+
+if __name__ == "__main__":
+    main()
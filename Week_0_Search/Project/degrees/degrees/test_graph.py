@@ -0,0 +1,174 @@
+import csv
+import importlib
+import importlib.util
+import multiprocessing
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import graph
+from graph import Graph, load_graph, read_stars, source_stamp
+
+NAMES = ["Kevin Bacon", "kevin bacon", "Tom Hanks", "Emma Watson", "Ann Lee"]
+
+
+def write_dataset(directory, people=40, movies=30, stars=160, seed=0):
+    """
+    Writes a small random dataset to `directory`, including people without
+    movies, repeated names and stars rows with unknown ids.
+    """
+    generator = random.Random(seed)
+    with open(os.path.join(directory, "people.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(people):
+            name = f"{generator.choice(NAMES)} {i % 7}"
+            writer.writerow([str(100 + i), name, str(1950 + i)])
+    with open(os.path.join(directory, "movies.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for j in range(movies):
+            writer.writerow([str(500 + j), f"Movie, Part {j}", str(1990 + j)])
+    with open(os.path.join(directory, "stars.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for _ in range(stars):
+            # The last few people never star in anything
+            writer.writerow([str(100 + generator.randrange(people - 3)),
+                             str(500 + generator.randrange(movies))])
+        writer.writerow(["999", "500"])
+        writer.writerow(["100", "999"])
+        writer.writerow(["998", "997"])
+
+
+def edges(store):
+    """Returns the set of (person_id, movie_id) stars of a Graph."""
+    return {
+        (person_id, movie_id)
+        for person_id, person in store.people.items()
+        for movie_id in person["movies"]
+    }
+
+
+class GraphTest(unittest.TestCase):
+
+    def setUp(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        self.directory = temporary.name
+        write_dataset(self.directory)
+
+    def test_unknown_ids_dropped(self):
+        parsed = load_graph(self.directory, snapshot=False)
+        stars = edges(parsed)
+        self.assertTrue(stars)
+        for person_id, movie_id in stars:
+            self.assertIn(person_id, parsed.people)
+            self.assertIn(movie_id, parsed.movies)
+        self.assertNotIn("999", parsed.people)
+        self.assertNotIn("999", parsed.movies)
+        self.assertEqual(len(parsed.people), 40)
+        self.assertEqual(len(parsed.movies), 30)
+
+    def test_snapshot_matches_csv(self):
+        parsed = load_graph(self.directory, snapshot=False)
+        loaded = load_graph(self.directory)
+        self.assertIsNotNone(loaded.path)
+        reloaded = load_graph(self.directory)
+        self.assertEqual(reloaded.path, loaded.path)
+        for view in ["people", "movies", "names"]:
+            self.assertEqual(dict(getattr(reloaded, view)),
+                             dict(getattr(parsed, view)), view)
+
+    def test_touching_csv_invalidates_snapshot(self):
+        path = os.path.join(self.directory, graph.SNAPSHOT_FILE)
+        load_graph(self.directory)
+        self.assertIsNotNone(
+            Graph.from_snapshot(path, source_stamp(self.directory))
+        )
+
+        stars = os.path.join(self.directory, "stars.csv")
+        info = os.stat(stars)
+        os.utime(stars, ns=(info.st_atime_ns, info.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(
+            Graph.from_snapshot(path, source_stamp(self.directory))
+        )
+
+        # A rebuilt snapshot sees rows appended since
+        with open(stars, "a", newline="") as f:
+            csv.writer(f).writerow(["137", "529"])
+        self.assertIn(("137", "529"), edges(load_graph(self.directory)))
+        self.assertIsNotNone(
+            Graph.from_snapshot(path, source_stamp(self.directory))
+        )
+
+    def test_parallel_parse_matches_serial(self):
+        write_dataset(self.directory, stars=2000, seed=1)
+        path = os.path.join(self.directory, "stars.csv")
+        people = {str(100 + i): i for i in range(40)}
+        movies = {str(500 + j): j for j in range(30)}
+        serial = read_stars(path, people, movies, processes=1)
+        with mock.patch.object(graph, "CHUNK_BYTES", 64), \
+                mock.patch("multiprocessing.Pool",
+                           wraps=multiprocessing.Pool) as pool:
+            parallel = read_stars(path, people, movies, processes=4)
+        self.assertTrue(pool.called)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(len(serial[0]), 2000)
+
+
+@unittest.skipUnless(importlib.util.find_spec("util"),
+                     "degrees.py needs util.py")
+class DegreesTest(unittest.TestCase):
+
+    def setUp(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        self.directory = temporary.name
+        write_dataset(self.directory)
+        self.degrees = importlib.import_module("degrees")
+        self.addCleanup(self.unload)
+
+    def unload(self):
+        """Resets the data loaded by the degrees module."""
+        degrees = self.degrees
+        degrees.names, degrees.people, degrees.movies = {}, {}, {}
+        degrees.graph = degrees.component_index = None
+
+    def test_views_and_paths_match_dict_loader(self):
+        degrees = self.degrees
+        self.unload()
+        degrees.load_data(self.directory)
+        names, people, movies = degrees.names, degrees.people, degrees.movies
+        person_ids = sorted(people)
+        expected = {
+            (source, target): degrees.shortest_path(source, target)
+            for source in person_ids[:8] for target in person_ids
+            if source != target
+        }
+
+        degrees.load_data(self.directory, components=True)
+        self.assertEqual(dict(degrees.people), people)
+        self.assertEqual(dict(degrees.movies), movies)
+        self.assertEqual(dict(degrees.names), names)
+        for method in ["bfs", "bidirectional", "hyperedge"]:
+            for (source, target), path in expected.items():
+                with self.subTest(method=method, source=source,
+                                  target=target):
+                    found = degrees.shortest_path(source, target, method)
+                    if path is None:
+                        self.assertIsNone(found)
+                        continue
+                    self.assertEqual(len(found), len(path))
+                    person = source
+                    for movie, star in found:
+                        self.assertIn(person, movies[movie]["stars"])
+                        self.assertIn(star, movies[movie]["stars"])
+                        person = star
+                    self.assertEqual(person, target)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,264 @@
+import json
+import math
+
+from logic import And, Biconditional, Implication, Not, Or, Sentence, Symbol
+
+
+class BDD():
+
+    # Terminal nodes, and the level below every variable's
+    FALSE = 0
+    TRUE = 1
+    TERMINAL = math.inf
+
+    def __init__(self, order=()):
+        """
+        Create a manager of reduced ordered binary decision diagrams that
+        share their nodes. Variables are ordered by `order`, and any
+        others in the order they are first used.
+        Node `u` tests the variable at `levels[u]` and continues to
+        `lows[u]` if it is false or `highs[u]` if it is true.
+        """
+        self.order = []
+        self.positions = {}
+        self.levels = [BDD.TERMINAL, BDD.TERMINAL]
+        self.lows = [BDD.FALSE, BDD.TRUE]
+        self.highs = [BDD.FALSE, BDD.TRUE]
+        self.unique = {}
+        self.cache = {}
+        self.compiled = {}
+        for name in order:
+            self.position(name)
+
+    def position(self, name):
+        """Returns the level of variable `name`, adding it last if new."""
+        if name not in self.positions:
+            self.positions[name] = len(self.order)
+            self.order.append(name)
+        return self.positions[name]
+
+    def node(self, level, low, high):
+        """Returns the unique reduced node testing `level`."""
+        if low == high:
+            return low
+        key = (level, low, high)
+        if key not in self.unique:
+            self.unique[key] = len(self.levels)
+            self.levels.append(level)
+            self.lows.append(low)
+            self.highs.append(high)
+        return self.unique[key]
+
+    def variable(self, name):
+        """Returns the node true exactly when variable `name` is."""
+        return self.node(self.position(name), BDD.FALSE, BDD.TRUE)
+
+    def ite(self, f, g, h):
+        """
+        Returns the node for "if f then g else h", caching results.
+        Works through an explicit stack, since a call may descend through
+        every variable of the manager.
+        """
+        results = []
+
+        # Triples to expand, and (level, key) pairs whose two cofactors'
+        # nodes are the last two results, to join into a node testing level
+        pending = [(f, g, h)]
+        while pending:
+            task = pending.pop()
+            if len(task) == 2:
+                level, key = task
+                high = results.pop()
+                low = results.pop()
+                result = self.node(level, low, high)
+                self.cache[key] = result
+                results.append(result)
+                continue
+
+            result = self.shortcut(*task)
+            if result is not None:
+                results.append(result)
+                continue
+            level = min(self.levels[u] for u in task)
+            pending.append((level, task))
+            pending.append(tuple(self.cofactor(u, level, True) for u in task))
+            pending.append(tuple(self.cofactor(u, level, False) for u in task))
+        return results[0]
+
+    def shortcut(self, f, g, h):
+        """
+        Returns the node for "if f then g else h" if it is a terminal case
+        or cached, or None.
+        """
+        if f == BDD.TRUE:
+            return g
+        if f == BDD.FALSE or g == h:
+            return h
+        if g == BDD.TRUE and h == BDD.FALSE:
+            return f
+        return self.cache.get((f, g, h))
+
+    def cofactor(self, u, level, value):
+        """Returns node `u` with the variable at `level` set to `value`."""
+        if self.levels[u] != level:
+            return u
+        return self.highs[u] if value else self.lows[u]
+
+    def negate(self, u):
+        """Returns the node for the negation of node `u`."""
+        return self.ite(u, BDD.FALSE, BDD.TRUE)
+
+    def compile(self, sentence):
+        """
+        Returns the node for `sentence`, visiting its operands through an
+        explicit stack. Frozen sentences are compiled once; any other may
+        have changed since it was last compiled.
+        """
+        nodes = {}
+        pending = [(sentence, False)]
+        while pending:
+            current, ready = pending.pop()
+            if id(current) in nodes:
+                continue
+            if current.frozen() and current in self.compiled:
+                nodes[id(current)] = self.compiled[current]
+                continue
+            operands = [
+                operand for operand in current.operands()
+                if isinstance(operand, Sentence)
+            ]
+            if not ready:
+                # Compile the operands first, leftmost first
+                pending.append((current, True))
+                pending.extend(
+                    (operand, False) for operand in reversed(operands)
+                )
+                continue
+            node = self.combine(
+                current, [nodes[id(operand)] for operand in operands]
+            )
+            if current.frozen():
+                self.compiled[current] = node
+            nodes[id(current)] = node
+        return nodes[id(sentence)]
+
+    def combine(self, sentence, operands):
+        """
+        Returns the node for `sentence` given the list of its operands'
+        nodes. Conjunctions and disjunctions are joined in pairs, so each
+        ite works on diagrams of similar size.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return self.negate(operands[0])
+        if isinstance(sentence, (And, Or)):
+            if not operands:
+                return BDD.TRUE if isinstance(sentence, And) else BDD.FALSE
+            while len(operands) > 1:
+                joined = []
+                for u, v in zip(operands[::2], operands[1::2]):
+                    if isinstance(sentence, And):
+                        joined.append(self.ite(u, v, BDD.FALSE))
+                    else:
+                        joined.append(self.ite(u, BDD.TRUE, v))
+                if len(operands) % 2:
+                    joined.append(operands[-1])
+                operands = joined
+            return operands[0]
+        if isinstance(sentence, Implication):
+            return self.ite(operands[0], operands[1], BDD.TRUE)
+        if isinstance(sentence, Biconditional):
+            return self.ite(operands[0], operands[1],
+                            self.negate(operands[1]))
+        raise Exception("nothing to compile")
+
+    def entails(self, knowledge, query):
+        """Checks if node `knowledge` implies node `query`."""
+        return self.ite(knowledge, query, BDD.TRUE) == BDD.TRUE
+
+    def count(self, u, symbols=None):
+        """
+        Returns the number of models of `symbols`, by default every
+        variable of the manager, in which node `u` is true. `symbols`
+        must include every variable `u` depends on.
+        """
+        n = len(self.order)
+        counts = {BDD.FALSE: 0, BDD.TRUE: 1}
+
+        def level(u):
+            return n if u <= BDD.TRUE else self.levels[u]
+
+        # Count models of the variables from each node's level down
+        pending = [u]
+        while pending:
+            v = pending[-1]
+            if v in counts:
+                pending.pop()
+                continue
+            low, high = self.lows[v], self.highs[v]
+            missing = [w for w in (low, high) if w not in counts]
+            if missing:
+                pending.extend(missing)
+                continue
+            pending.pop()
+            counts[v] = (
+                counts[low] * 2 ** (level(low) - level(v) - 1)
+                + counts[high] * 2 ** (level(high) - level(v) - 1)
+            )
+        total = counts[u] * 2 ** level(u)
+        if symbols is None:
+            return total
+        return total >> (n - len(set(symbols)))
+
+    def save(self, path, roots):
+        """
+        Write the nodes reachable from the dictionary `roots` of names to
+        nodes, and the variable order, to a JSON file at `path`.
+        """
+        numbers = {BDD.FALSE: BDD.FALSE, BDD.TRUE: BDD.TRUE}
+        nodes = []
+        for root in roots.values():
+            pending = [root]
+            while pending:
+                u = pending[-1]
+                if u in numbers:
+                    pending.pop()
+                    continue
+                missing = [
+                    w for w in (self.lows[u], self.highs[u])
+                    if w not in numbers
+                ]
+                if missing:
+                    pending.extend(missing)
+                    continue
+                pending.pop()
+                numbers[u] = len(nodes) + 2
+                nodes.append([self.levels[u], numbers[self.lows[u]],
+                              numbers[self.highs[u]]])
+        with open(path, "w") as f:
+            json.dump({
+                "order": self.order,
+                "nodes": nodes,
+                "roots": {name: numbers[u] for name, u in roots.items()}
+            }, f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a file written by save and return a new manager holding its
+        nodes, and the dictionary of names to root nodes.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        bdd = cls(data["order"])
+        numbers = [BDD.FALSE, BDD.TRUE]
+        for level, low, high in data["nodes"]:
+            numbers.append(bdd.node(level, numbers[low], numbers[high]))
+        return bdd, {name: numbers[u] for name, u in data["roots"].items()}
+
+
+def bdd_check(knowledge, query):
+    """Checks entailment by comparing binary decision diagrams."""
+    bdd = BDD(sorted(set.union(knowledge.symbols(), query.symbol_set())))
+    return bdd.entails(bdd.compile(knowledge), bdd.compile(query))
@@ -0,0 +1,43 @@
+import sys
+import time
+
+from logic import *
+from parallel import parallel_check
+
+
+def chain(n):
+    """
+    Returns a knowledge base of n symbols, each implying the next, and
+    a query it entails, so every one of the 2^n models must be checked.
+    """
+    symbols = [Symbol(f"x{i}") for i in range(n)]
+    knowledge = And()
+    for i in range(n - 1):
+        knowledge.add(Implication(symbols[i], symbols[i + 1]))
+    return knowledge, Implication(symbols[0], symbols[-1])
+
+
+def main():
+    if len(sys.argv) not in [1, 2, 3]:
+        sys.exit("Usage: python benchmark.py [symbols] [processes]")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    knowledge, query = chain(n)
+
+    start = time.perf_counter()
+    serial = model_check(knowledge, query)
+    serial_seconds = time.perf_counter() - start
+    print(f"Serial: {serial} in {serial_seconds:.2f}s, "
+          f"{2 ** n / serial_seconds:,.0f} models/s")
+
+    report = {}
+    parallel = parallel_check(knowledge, query, processes, report=report)
+    print(f"Parallel: {parallel} in {report['seconds']:.2f}s, "
+          f"{serial_seconds / report['seconds']:.2f}x speedup")
+    for pid, worker in sorted(report["workers"].items()):
+        print(f"    worker {pid}: {worker['models']:,} models, "
+              f"{worker['models_per_second']:,.0f} models/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+try:
+    import numpy
+except ImportError:
+    # Only the bit-plane engine needs numpy
+    numpy = None
+
+# Models evaluated together by the bit-plane engine, as a power of two
+BLOCK_BITS = 20
+
+
+def planes(sentence, columns, ones):
+    """
+    Returns the truth values of `sentence` over a block of models as a
+    numpy array of packed bits, given each symbol's bits in `columns`
+    and an array `ones` of all true bits.
+    """
+    if isinstance(sentence, Symbol):
+        return columns[sentence.name]
+    if isinstance(sentence, Not):
+        return ~planes(sentence.operand, columns, ones)
+    if isinstance(sentence, And):
+        result = ones
+        for conjunct in sentence.conjuncts:
+            result = result & planes(conjunct, columns, ones)
+        return result
+    if isinstance(sentence, Or):
+        result = ~ones
+        for disjunct in sentence.disjuncts:
+            result = result | planes(disjunct, columns, ones)
+        return result
+    if isinstance(sentence, Implication):
+        return (~planes(sentence.antecedent, columns, ones)
+                | planes(sentence.consequent, columns, ones))
+    if isinstance(sentence, Biconditional):
+        return ~(planes(sentence.left, columns, ones)
+                 ^ planes(sentence.right, columns, ones))
+    raise Exception("nothing to evaluate")
+
+
+def plane_blocks(sentences, symbols):
+    """
+    Evaluates `sentences` over every model of `symbols` with numpy,
+    BLOCK_BITS models at a time, packed 64 to a 64-bit word.
+
+    Yields (start, valid, planes) per block: the model number of its
+    first bit, bits set for the models that exist, and each sentence's
+    truth bits. Model m gives symbol i the value of its bit i.
+    """
+    if numpy is None:
+        raise Exception("the bit-plane engine requires numpy")
+    n = len(symbols)
+    block_bits = max(6, min(n, BLOCK_BITS))
+    words = 2 ** (block_bits - 6)
+    ones = numpy.full(words, 2 ** 64 - 1, dtype=numpy.uint64)
+    zeros = numpy.zeros(words, dtype=numpy.uint64)
+    valid = ones.copy()
+    if n < 6:
+        valid[0] = 2 ** (2 ** n) - 1
+
+    # Symbols below the block size have the same bits in every block
+    columns = {}
+    word_index = numpy.arange(words, dtype=numpy.uint64)
+    for i, symbol in enumerate(symbols[:block_bits]):
+        if i < 6:
+            pattern = sum(1 << m for m in range(64) if m >> i & 1)
+            columns[symbol] = numpy.full(words, pattern, dtype=numpy.uint64)
+        else:
+            bit = (word_index >> numpy.uint64(i - 6)) & numpy.uint64(1)
+            columns[symbol] = numpy.where(bit == 1, ones, zeros)
+
+    for start in range(0, 2 ** n, 2 ** block_bits):
+        for i, symbol in enumerate(symbols[block_bits:], block_bits):
+            columns[symbol] = ones if start >> i & 1 else zeros
+        yield start, valid, [
+            planes(sentence, columns, ones) & valid for sentence in sentences
+        ]
+
+
+def unpack_models(start, bits):
+    """Returns the model numbers of the set bits of a packed block."""
+    flags = numpy.unpackbits(
+        bits.astype("<u8").view(numpy.uint8), bitorder="little"
+    )
+    return [start + int(i) for i in numpy.flatnonzero(flags)]
+
+
+def count_bits(bits):
+    """Returns the number of set bits in a packed block."""
+    return int(numpy.unpackbits(bits.view(numpy.uint8)).sum())
+
+
+def truth_planes(knowledge, query=None, list_models=False):
+    """
+    Sweeps every model once with the bit-plane engine.
+
+    Returns a dictionary of the sorted `symbols`, the `count` of models
+    where knowledge is true, whether those all make query true
+    (`entailed`, None without a query) and, if `list_models`, the
+    `models` of knowledge as integers whose bit i is symbols[i].
+    """
+    symbols = knowledge.symbols()
+    if query is not None:
+        symbols |= query.symbol_set()
+    symbols = sorted(symbols)
+    sentences = [knowledge] if query is None else [knowledge, query]
+
+    count = 0
+    entailed = None if query is None else True
+    models = [] if list_models else None
+    for start, valid, truths in plane_blocks(sentences, symbols):
+        count += count_bits(truths[0])
+        if query is not None and (truths[0] & ~truths[1]).any():
+            entailed = False
+        if list_models:
+            models.extend(unpack_models(start, truths[0]))
+    return {
+        "symbols": symbols,
+        "count": count,
+        "entailed": entailed,
+        "models": models
+    }
+
+
+def numpy_check(knowledge, query):
+    """Checks entailment one block of packed models at a time."""
+    symbols = sorted(set.union(knowledge.symbols(), query.symbol_set()))
+    for _, _, (known, holds) in plane_blocks([knowledge, query], symbols):
+        if (known & ~holds).any():
+            return False
+    return True
@@ -21,10 +21,11 @@ symbols = characters + rooms + weapons
 
 
 def check_knowledge(knowledge):
-    for symbol in symbols:
-        if model_check(knowledge, symbol):
+    answers = model_check_many(knowledge, symbols)
+    for symbol, answer in zip(symbols, answers):
+        if answer == "entailed":
             termcolor.cprint(f"{symbol}: YES", "green")
-        elif not model_check(knowledge, Not(symbol)):
+        elif answer == "unknown":
             print(f"{symbol}: MAYBE")
 
 
@@ -0,0 +1,186 @@
+import collections
+
+from decompose import join, root
+from logic import And
+from pruning import partial, partial_models
+from sat import CNF
+
+
+def enumerate_models(knowledge, symbols=None):
+    """
+    Yields every model in which the knowledge base is true, one at a time,
+    as an integer whose bit i holds symbols[i], by default its own symbols
+    in sorted order.
+
+    Symbols are assigned one at a time; a partial model in which
+    knowledge is already false is skipped, and the completions of one in
+    which it is already true are yielded without evaluating them.
+    """
+    if symbols is None:
+        symbols = sorted(knowledge.symbol_set())
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    def judge(values, known):
+        return partial(knowledge, index, values, known)
+
+    for values, depth, holds in partial_models(judge):
+        if holds:
+            for rest in range(2 ** (len(symbols) - depth)):
+                yield values | rest << depth
+
+
+def count_models(knowledge, symbols=None):
+    """
+    Returns the number of models of `symbols`, by default the knowledge
+    base's own, in which it is true; `symbols` must include every symbol
+    of the knowledge base.
+
+    Counts the models of its Tseitin CNF, where every gate variable is
+    determined by the symbols, without listing any of them.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    for symbol in knowledge.symbol_set() if symbols is None else symbols:
+        cnf.symbol(symbol)
+
+    clauses = set()
+    for clause in cnf.clauses:
+        clause = frozenset(clause)
+        if not any(-literal in clause for literal in clause):
+            clauses.add(clause)
+    clauses = frozenset(clauses)
+    free = len(cnf.names) - 1 - len(clause_variables(clauses))
+    return count_clauses(clauses, {}) << free
+
+
+def count_clauses(clauses, cache):
+    """
+    Returns the number of assignments to the variables of `clauses`, a
+    frozenset of frozensets of literals, that satisfy all of them.
+
+    Clauses sharing no variables are counted separately and multiplied,
+    and every count is cached by its clauses; otherwise the most common
+    variable is set each way, propagating unit clauses. Subproblems wait
+    on an explicit stack until the counts they depend on are cached.
+    """
+    plans = {}
+    pending = [clauses]
+    while pending:
+        current = pending[-1]
+        if current in cache:
+            pending.pop()
+            continue
+        if frozenset() in current or not current:
+            cache[current] = 0 if current else 1
+            pending.pop()
+            continue
+        if current not in plans:
+            plans[current] = plan_count(current)
+        product, parts = plans[current]
+
+        counted = [cache[part] for part, _ in parts if part in cache]
+        waiting = [part for part, _ in parts if part not in cache]
+        if waiting and not (product and 0 in counted):
+            pending.append(waiting[0])
+            continue
+
+        if product:
+            result = 1
+            for count in counted:
+                result *= count
+            if waiting:
+                result = 0
+        else:
+            result = sum(cache[part] << free for part, free in parts)
+        cache[current] = result
+        del plans[current]
+        pending.pop()
+    return cache[clauses]
+
+
+def plan_count(clauses):
+    """
+    Returns (product, parts) for counting the models of `clauses`: either
+    components whose counts multiply, or the clauses left by setting the
+    most common variable each way, with how many variables each leaves
+    free, whose shifted counts add up.
+    """
+    components = split_clauses(clauses)
+    if len(components) > 1:
+        return True, [(component, 0) for component in components]
+
+    variables = clause_variables(clauses)
+    occurrences = collections.Counter(
+        abs(literal) for clause in clauses for literal in clause
+    )
+    variable = max(occurrences, key=occurrences.get)
+    parts = []
+    for literal in [variable, -variable]:
+        reduced, assigned = condition(clauses, literal)
+        if reduced is None:
+            continue
+        # Variables left in no clause may take either value
+        free = (len(variables) - len(assigned)
+                - len(clause_variables(reduced)))
+        parts.append((reduced, free))
+    return False, parts
+
+
+def clause_variables(clauses):
+    """Returns the set of variables in `clauses`."""
+    return {abs(literal) for clause in clauses for literal in clause}
+
+
+def split_clauses(clauses):
+    """Returns `clauses` split into groups that share no variables."""
+    parent = {}
+    for clause in clauses:
+        join(parent, [abs(literal) for literal in clause])
+
+    groups = {}
+    for clause in clauses:
+        key = root(parent, abs(next(iter(clause))))
+        groups.setdefault(key, []).append(clause)
+    return [frozenset(group) for group in groups.values()]
+
+
+def condition(clauses, literal):
+    """
+    Makes `literal` true in `clauses` and propagates unit clauses.
+    Returns the remaining clauses and the set of variables assigned,
+    or (None, None) if a clause became false.
+    """
+    assigned = set()
+    pending = [literal]
+    while pending:
+        literal = pending.pop()
+        if -literal in assigned:
+            return None, None
+        if literal in assigned:
+            continue
+        assigned.add(literal)
+        remaining = set()
+        for clause in clauses:
+            if literal in clause:
+                continue
+            if -literal in clause:
+                clause = clause - {-literal}
+                if not clause:
+                    return None, None
+                if len(clause) == 1:
+                    pending.extend(clause)
+            remaining.add(clause)
+        clauses = frozenset(remaining)
+    return clauses, {abs(literal) for literal in assigned}
+
+
+def probability(knowledge, query):
+    """
+    Returns the fraction of the knowledge base's models in which query is
+    true, counted over the symbols of both, or None if it has no models.
+    """
+    symbols = knowledge.symbol_set() | query.symbol_set()
+    total = count_models(knowledge, symbols)
+    if not total:
+        return None
+    return count_models(And(knowledge, query), symbols) / total
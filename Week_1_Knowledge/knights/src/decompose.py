@@ -0,0 +1,79 @@
+from logic import And, model_check
+
+
+def decompose(knowledge):
+    """
+    Splits the conjuncts of a knowledge base, flattening nested Ands, into
+    components that share no symbols. Returns a list of (symbols, And of
+    the component's conjuncts) pairs.
+    """
+    conjuncts = []
+    pending = [knowledge]
+    while pending:
+        sentence = pending.pop()
+        if isinstance(sentence, And):
+            pending.extend(reversed(sentence.conjuncts))
+        else:
+            conjuncts.append(sentence)
+
+    # Union-find over symbol names
+    parent = {}
+    for conjunct in conjuncts:
+        join(parent, conjunct.symbol_set())
+
+    # Conjuncts without symbols form a component of their own
+    groups = {}
+    for conjunct in conjuncts:
+        symbols = conjunct.symbol_set()
+        key = root(parent, next(iter(symbols))) if symbols else None
+        groups.setdefault(key, []).append(conjunct)
+    components = []
+    for group in groups.values():
+        component = And(*group)
+        components.append((frozenset(component.symbol_set()), component))
+    return components
+
+
+def root(parent, item):
+    """
+    Returns the representative of `item` in the union-find forest
+    `parent`, a dictionary of items to their parents, adding `item` as
+    its own component if new. Path halving keeps the trees shallow.
+    """
+    parent.setdefault(item, item)
+    while parent[item] != item:
+        parent[item] = parent[parent[item]]
+        item = parent[item]
+    return item
+
+
+def join(parent, items):
+    """Merges the components of `items` in the union-find forest `parent`."""
+    items = list(items)
+    if items:
+        first = root(parent, items[0])
+        for item in items[1:]:
+            parent[root(parent, item)] = first
+
+
+def satisfiable(sentence):
+    """Checks if some model of the sentence's symbols makes it true."""
+    symbols = sorted(sentence.symbol_set())
+    return any(map(sentence.compile(symbols), range(2 ** len(symbols))))
+
+
+def decomposed_check(knowledge, query, method="enumerate"):
+    """
+    Checks entailment using only the knowledge base's components that
+    share symbols with the query, with the given model checking method.
+    The others matter only if one is unsatisfiable, which makes the
+    knowledge base entail everything.
+    """
+    touched = query.symbol_set()
+    relevant = []
+    for symbols, component in decompose(knowledge):
+        if symbols & touched:
+            relevant.append(component)
+        elif not satisfiable(component):
+            return True
+    return model_check(And(*relevant), query, method=method)
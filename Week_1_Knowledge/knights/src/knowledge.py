@@ -0,0 +1,124 @@
+from decompose import join, root
+from logic import And, Sentence, classify
+
+
+class KnowledgeBase():
+
+    def __init__(self, *sentences):
+        """
+        Create a knowledge base of `sentences` that keeps the list of
+        models, as integers whose bit i holds symbols[i], in which all of
+        them are true, along with the models before each was added.
+        """
+        self.sentences = []
+        self.symbols = []
+        self.models = [0]
+        self.checkpoints = []
+        self.answers = {}
+        self.parent = {}
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """
+        Adds `sentence`, keeping only the models in which it is true and
+        forgetting cached answers that may depend on it.
+        """
+        Sentence.validate(sentence)
+        satisfiable = bool(self.models)
+        self.apply(sentence)
+        join(self.parent, sentence.symbol_set())
+        self.forget(sentence.symbol_set(), satisfiable != bool(self.models))
+
+    def retract(self, sentence):
+        """
+        Removes the last added sentence equal to `sentence`, restoring the
+        models from before it was added and adding any later sentences
+        again.
+        """
+        for i in reversed(range(len(self.sentences))):
+            if self.sentences[i] == sentence:
+                break
+        else:
+            raise ValueError(f"{sentence} is not in the knowledge base")
+
+        # Answers about the retracted sentence's component may change
+        affected = self.component(sentence.symbol_set())
+        satisfiable = bool(self.models)
+
+        count, self.models = self.checkpoints[i]
+        replay = self.sentences[i + 1:]
+        del self.sentences[i:]
+        del self.checkpoints[i:]
+        del self.symbols[count:]
+        for later in replay:
+            self.apply(later)
+
+        self.parent = {}
+        for remaining in self.sentences:
+            join(self.parent, remaining.symbol_set())
+        self.forget(affected, satisfiable != bool(self.models))
+
+    def ask(self, query):
+        """
+        Returns "entailed", "refuted" or "unknown" for `query`, cached
+        until a sentence sharing a component with it is added or retracted.
+        Only frozen queries are cached, since any other may change.
+        """
+        if not query.frozen():
+            return classify(query, self.symbols, self.models)
+        if query not in self.answers:
+            self.answers[query] = classify(query, self.symbols, self.models)
+        return self.answers[query]
+
+    def entails(self, query):
+        """Checks if the knowledge base entails `query`."""
+        return self.ask(query) == "entailed"
+
+    def knowledge(self):
+        """Returns the conjunction of the knowledge base's sentences."""
+        return And(*self.sentences)
+
+    def apply(self, sentence):
+        """
+        Records a checkpoint, then adds `sentence` to the models, giving
+        them every value of symbols it introduces.
+        """
+        self.checkpoints.append((len(self.symbols), self.models))
+        self.sentences.append(sentence)
+
+        known = set(self.symbols)
+        new = sorted(sentence.symbol_set() - known)
+        shift = len(self.symbols)
+        self.symbols.extend(new)
+        holds = sentence.compile(self.symbols)
+        self.models = [
+            extended
+            for model in self.models
+            for extended in (
+                model | rest << shift for rest in range(2 ** len(new))
+            )
+            if holds(extended)
+        ]
+
+    def component(self, symbols):
+        """Returns every symbol sharing a component with `symbols`."""
+        roots = {root(self.parent, symbol) for symbol in symbols}
+        return {
+            symbol for symbol in list(self.parent)
+            if root(self.parent, symbol) in roots
+        }
+
+    def forget(self, symbols, everything=False):
+        """
+        Forgets cached answers to queries sharing a component with
+        `symbols`, or every answer if `everything`.
+        """
+        if everything:
+            self.answers = {}
+            return
+        affected = self.component(symbols)
+        self.answers = {
+            query: answer for query, answer in self.answers.items()
+            if not (query.symbol_set() & affected)
+        }
@@ -1,8 +1,50 @@
-import itertools
+import importlib
+import weakref
+
+# Modules next to this one that provide the other model checking
+# methods, and their checkers, imported on first use
+ENGINES = {
+    "bdd": ("bdd", "bdd_check"),
+    "components": ("decompose", "decomposed_check"),
+    "numpy": ("bitplanes", "numpy_check"),
+    "parallel": ("parallel", "parallel_check"),
+    "prune": ("pruning", "prune_check"),
+    "sat": ("sat", "sat_check")
+}
+
+# Bumped by every And.add(), so a sentence with an And or Or in it knows
+# whether its cached hash, symbols and models are still current
+generation = 0
 
 
 class Sentence():
 
+    # Per-node storage; subclasses add their own operand slots.
+    # A sentence with no And or Or in it can never change, so it is
+    # frozen: interned, with its hash and symbols cached for good. Any
+    # other sentence caches them with the generation they were computed
+    # in, and recomputes them once an And has changed since.
+    __slots__ = ("_hash", "_symbols", "_models", "_generation", "__weakref__")
+
+    # Every live frozen sentence, keyed by class and operands, so
+    # structurally equal ones are one object
+    nodes = weakref.WeakValueDictionary()
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(self) is not type(other) or self.frozen() and other.frozen():
+            return False
+        return (hash(self) == hash(other)
+                and self.operands() == other.operands())
+
+    def __hash__(self):
+        self.refresh()
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), self.operands())
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,7 +55,102 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns the cached set of symbols, which must not be modified."""
+        self.refresh()
+        return self._symbols
+
+    def operands(self):
+        """Returns a tuple of the sentence's operands."""
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def frozen(self):
+        """Checks if the sentence has no And or Or in it."""
+        return self._generation is None
+
+    def refresh(self):
+        """
+        Recomputes the cached hash and symbols, and forgets the cached
+        models, if the sentence is not frozen and an And has changed
+        since they were cached.
+        """
+        if self._generation is None or self._generation == generation:
+            return
+        operands = self.operands()
+        self._hash = hash((type(self).__name__, operands))
+        self._symbols = frozenset().union(
+            *[operand.symbol_set() for operand in operands]
+        )
+        self._models = None
+        self._generation = generation
+
+    def expression(self, index):
+        """
+        Returns Python source evaluating the sentence on an integer model
+        `m`, whose bit `index[name]` holds each symbol's truth value.
+        """
+        raise Exception("nothing to compile")
+
+    def compile(self, symbols):
+        """
+        Compiles the sentence into a function of one integer model, whose
+        bit i is the truth value of the i-th name in `symbols`.
+        """
+        index = {symbol: i for i, symbol in enumerate(symbols)}
+        missing = self.symbol_set() - index.keys()
+        if missing:
+            raise Exception(f"variable {min(missing)} not in model")
+        try:
+            return eval(f"lambda m: bool({self.expression(index)})")
+        except (SyntaxError, RecursionError, MemoryError):
+            # Too deeply nested for the parser; walk the tree instead
+            def evaluate(m):
+                return self.evaluate({
+                    symbol: bool(m >> i & 1) for symbol, i in index.items()
+                })
+            return evaluate
+
+    def models(self):
+        """
+        Returns (symbols, models): the sentence's sorted symbols and the
+        list of integer models, with bit i for symbols[i], in which it is
+        true. The list is computed once and kept until an And changes.
+        """
+        self.refresh()
+        if self._models is None:
+            symbols = sorted(self.symbol_set())
+            holds = self.compile(symbols)
+            self._models = (
+                symbols, list(filter(holds, range(2 ** len(symbols))))
+            )
+        return self._models
+
+    @classmethod
+    def make(cls, *operands):
+        """
+        Returns a sentence of class `cls` with `operands`. If it would be
+        frozen, that is the live one stored under them, if any.
+        """
+        for operand in operands:
+            Sentence.validate(operand)
+        frozen = all(operand.frozen() for operand in operands)
+        key = (cls,) + operands
+        if frozen:
+            node = Sentence.nodes.get(key)
+            if node is not None:
+                return node
+        node = object.__new__(cls)
+        for field, operand in zip(cls.__slots__, operands):
+            setattr(node, field, operand)
+        node._hash = node._symbols = node._models = None
+        node._generation = -1
+        if frozen:
+            node.refresh()
+            node._generation = None
+            Sentence.nodes[key] = node
+        return node
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +180,18 @@ class Sentence():
 
 
 class Symbol(Sentence):
-
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
-
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        node = Sentence.nodes.get((cls, name))
+        if node is None:
+            node = object.__new__(cls)
+            node.name = name
+            node._hash = hash(("symbol", name))
+            node._symbols = frozenset([name])
+            node._models = node._generation = None
+            Sentence.nodes[(cls, name)] = node
+        return node
 
     def __repr__(self):
         return self.name
@@ -60,25 +200,20 @@ class Symbol(Sentence):
         try:
             return bool(model[self.name])
         except KeyError:
-            raise EvaluationException(f"variable {self.name} not in model")
+            raise Exception(f"variable {self.name} not in model")
 
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def expression(self, index):
+        return f"m >> {index[self.name]} & 1"
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
-
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+    __slots__ = ("operand",)
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def __new__(cls, operand):
+        return cls.make(operand)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +224,23 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def expression(self, index):
+        return f"not ({self.operand.expression(index)})"
 
 
 class And(Sentence):
+    # Never frozen, since add() changes a conjunction in place
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self._hash = self._symbols = self._models = None
+        self._generation = -1
 
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    def operands(self):
+        return tuple(self.conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +249,10 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        global generation
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        generation += 1
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +263,26 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return " and ".join([f"({conjunct.expression(index)})"
+                             for conjunct in self.conjuncts])
 
 
 class Or(Sentence):
+    # Never frozen, to match And
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
+        self._hash = self._symbols = self._models = None
+        self._generation = -1
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    def operands(self):
+        return tuple(self.disjuncts)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +297,18 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return " or ".join([f"({disjunct.expression(index)})"
+                            for disjunct in self.disjuncts])
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
-        Sentence.validate(antecedent)
-        Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+    __slots__ = ("antecedent", "consequent")
 
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    def __new__(cls, antecedent, consequent):
+        return cls.make(antecedent, consequent)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +322,17 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"not ({antecedent}) or ({consequent})"
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
-        Sentence.validate(left)
-        Sentence.validate(right)
-        self.left = left
-        self.right = right
-
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+    __slots__ = ("left", "right")
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    def __new__(cls, left, right):
+        return cls.make(left, right)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -221,44 +348,86 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-    truth_table = []
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-            truth_table.append(model)
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"(not ({left})) == (not ({right}))"
+
+
+def model_check(knowledge, query, method="enumerate"):
+    """
+    Checks if knowledge base entails query with the given method:
+        "enumerate"   evaluates every model
+        "components"  enumerates only the components of knowledge that
+                      share symbols with query
+        "numpy"       evaluates blocks of packed models with numpy
+        "parallel"    enumerates on every core
+        "prune"       searches partial models
+        "sat"         proves knowledge ∧ ¬query unsatisfiable
+        "bdd"         compares binary decision diagrams
+    Every method but "enumerate" lives in its module listed in ENGINES.
+    """
+    if method == "enumerate":
+        return enumerate_check(knowledge, query)
+    if method not in ENGINES:
+        raise ValueError(f"unknown model checking method {method}")
+    module, checker = ENGINES[method]
+    try:
+        engine = importlib.import_module(module)
+    except ModuleNotFoundError as error:
+        if error.name != module:
+            raise
+        raise Exception(
+            f"model checking method {method} requires {module}.py"
+        )
+    return getattr(engine, checker)(knowledge, query)
+
+
+def model_check_many(knowledge, queries):
+    """
+    Checks every query against the knowledge base's models, enumerated
+    once and cached on it until an And changes. Returns a list with, for
+    each query, "entailed" if it is true in every model of knowledge (as
+    it is when knowledge has none), "refuted" if it is false in every
+    one, and "unknown" otherwise.
+    """
+    symbols, models = knowledge.models()
+    return [classify(query, symbols, models) for query in queries]
+
+
+def classify(query, symbols, models):
+    """
+    Returns "entailed", "refuted" or "unknown" for `query` given the
+    integer `models`, whose bit i holds symbols[i], of a knowledge base.
+    Symbols only the query mentions can take either value.
+    """
+    extra = sorted(query.symbol_set() - set(symbols))
+    holds = query.compile(list(symbols) + extra)
+    shift = len(symbols)
+    true = false = False
+    for model in models:
+        for rest in range(2 ** len(extra)):
+            if holds(model | rest << shift):
+                true = True
+            else:
+                false = True
+        if true and false:
+            return "unknown"
+    return "refuted" if false else "entailed"
+
+
+def enumerate_check(knowledge, query):
+    """Checks entailment by evaluating every model of the symbols."""
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = sorted(set.union(knowledge.symbols(), query.symbol_set()))
+
+    # Compile both into functions of a model whose bit i is symbols[i]
+    knowledge_holds = knowledge.compile(symbols)
+    query_holds = query.compile(symbols)
 
-    # Check that knowledge entails query
-    ret = check_all(knowledge, query, symbols, dict())
-    return ret
+    # Check that the query is true in every model where knowledge is true
+    for model in range(2 ** len(symbols)):
+        if knowledge_holds(model) and not query_holds(model):
+            return False
+    return True
@@ -51,6 +51,7 @@ knowledge.add(And(
     Not(Symbol("yellow3"))
 ))
 
-for symbol in symbols:
-    if model_check(knowledge, symbol):
+answers = model_check_many(knowledge, symbols)
+for symbol, answer in zip(symbols, answers):
+    if answer == "entailed":
         print(symbol)
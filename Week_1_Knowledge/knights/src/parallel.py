@@ -0,0 +1,83 @@
+import math
+import multiprocessing
+import os
+import time
+
+# Chunks per worker process when splitting the models, as a power of two
+SPLIT_BITS = 3
+
+# Compiled knowledge and query of a parallel model checking worker
+worker_knowledge = None
+worker_query = None
+
+
+def parallel_check(knowledge, query, processes=None, split=None,
+                   report=None):
+    """
+    Checks entailment on a pool of `processes` worker processes.
+
+    Fixing the first `split` symbols divides the models into 2^split
+    contiguous chunks, checked independently; every worker is stopped as
+    soon as one chunk holds a counterexample. If `report` is a
+    dictionary, the wall time and each worker's models checked and
+    models per second are stored in it.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbol_set()))
+    processes = processes or os.cpu_count() or 1
+    if split is None:
+        split = math.ceil(math.log2(processes)) + SPLIT_BITS
+    split = min(split, len(symbols))
+
+    start = time.perf_counter()
+    workers = {}
+    entailed = True
+    with multiprocessing.Pool(
+        processes, initializer=init_check_worker,
+        initargs=(knowledge, query, symbols)
+    ) as pool:
+        chunks = [(chunk, len(symbols) - split) for chunk in range(2 ** split)]
+        for holds, pid, models, seconds in pool.imap_unordered(
+            check_chunk, chunks
+        ):
+            worker = workers.setdefault(pid, {"models": 0, "seconds": 0.0})
+            worker["models"] += models
+            worker["seconds"] += seconds
+            if not holds:
+                # Leaving the pool terminates the workers still running
+                entailed = False
+                break
+
+    if report is not None:
+        report["seconds"] = time.perf_counter() - start
+        report["workers"] = {
+            pid: dict(worker, models_per_second=(
+                worker["models"] / worker["seconds"]
+                if worker["seconds"] else None
+            ))
+            for pid, worker in workers.items()
+        }
+    return entailed
+
+
+def init_check_worker(knowledge, query, symbols):
+    """Compiles the knowledge and query in a worker process."""
+    global worker_knowledge, worker_query
+    worker_knowledge = knowledge.compile(symbols)
+    worker_query = query.compile(symbols)
+
+
+def check_chunk(chunk):
+    """
+    Checks the models whose high bits are `chunk[0]`, above `chunk[1]`
+    free low bits. Returns whether the query holds in all of them where
+    knowledge does, the worker's process id, the number of models
+    checked and the seconds taken.
+    """
+    high, low = chunk
+    start = time.perf_counter()
+    first = high << low
+    for model in range(first, first + 2 ** low):
+        if worker_knowledge(model) and not worker_query(model):
+            return (False, os.getpid(), model - first + 1,
+                    time.perf_counter() - start)
+    return True, os.getpid(), 2 ** low, time.perf_counter() - start
@@ -0,0 +1,116 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+def partial(sentence, index, values, known):
+    """
+    Evaluates `sentence` under a partial model: bit `index[name]` of
+    `known` is set for each assigned symbol, and the same bit of `values`
+    holds its value. Returns True, False or, if the result still depends
+    on unassigned symbols, None.
+    """
+    if isinstance(sentence, Symbol):
+        bit = 1 << index[sentence.name]
+        if known & bit:
+            return bool(values & bit)
+        return None
+    if isinstance(sentence, Not):
+        value = partial(sentence.operand, index, values, known)
+        return None if value is None else not value
+    if isinstance(sentence, And):
+        result = True
+        for conjunct in sentence.conjuncts:
+            value = partial(conjunct, index, values, known)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+    if isinstance(sentence, Or):
+        result = False
+        for disjunct in sentence.disjuncts:
+            value = partial(disjunct, index, values, known)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+    if isinstance(sentence, Implication):
+        antecedent = partial(sentence.antecedent, index, values, known)
+        if antecedent is False:
+            return True
+        consequent = partial(sentence.consequent, index, values, known)
+        if consequent is True or antecedent is None:
+            return True if consequent is True else None
+        return consequent
+    if isinstance(sentence, Biconditional):
+        left = partial(sentence.left, index, values, known)
+        if left is None:
+            return None
+        right = partial(sentence.right, index, values, known)
+        if right is None:
+            return None
+        return left == right
+    raise Exception("nothing to evaluate")
+
+
+def partial_models(judge):
+    """
+    Walks partial models, depth first, assigning symbol 0, 1, ... in
+    order and each true first. The model is a bitmask; backtracking
+    clears bits popped off a trail of the values tried at each depth.
+
+    `judge(values, known)` returns None to assign the next symbol, which
+    it must not do once every symbol is assigned, or anything else to
+    skip every extension of the partial model. Yields (values, depth,
+    verdict) for each partial model skipped, where `depth` symbols are
+    assigned.
+    """
+    values = known = 0
+    trail = []
+    while True:
+        verdict = judge(values, known)
+        if verdict is None:
+            # Assign the next symbol true first
+            bit = 1 << len(trail)
+            known |= bit
+            values |= bit
+            trail.append(True)
+            continue
+        yield values, len(trail), verdict
+
+        # Backtrack to the deepest symbol not yet tried false
+        while trail:
+            bit = 1 << (len(trail) - 1)
+            if trail.pop():
+                values &= ~bit
+                trail.append(False)
+                break
+            known &= ~bit
+        else:
+            return
+
+
+def prune_check(knowledge, query):
+    """
+    Checks entailment by assigning symbols one at a time and evaluating
+    knowledge and query under each partial model, skipping every
+    extension of one where knowledge is already false or both are
+    already true, and stopping at one where knowledge is already true
+    but query false.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbol_set()))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    def judge(values, known):
+        known_value = partial(knowledge, index, values, known)
+        if known_value is False:
+            return True
+        query_value = partial(query, index, values, known)
+        if known_value is True and query_value is not None:
+            return query_value
+        return None
+
+    for _, _, holds in partial_models(judge):
+        if not holds:
+            return False
+    return True
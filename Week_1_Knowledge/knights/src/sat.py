@@ -0,0 +1,343 @@
+import heapq
+
+from logic import And, Biconditional, Implication, Not, Or, Sentence, Symbol
+
+
+class CNF():
+
+    def __init__(self):
+        """
+        Create an empty formula in conjunctive normal form.
+        Variables are numbered from 1, a literal is a variable or its
+        negation, and each clause is a list of literals.
+        """
+        self.names = [None]
+        self.variables = {}
+        self.literals = {}
+        self.clauses = []
+
+    def variable(self, name=None):
+        """Returns a new variable, named after a symbol or not."""
+        self.names.append(name)
+        return len(self.names) - 1
+
+    def symbol(self, name):
+        """Returns the variable of the symbol `name`."""
+        if name not in self.variables:
+            self.variables[name] = self.variable(name)
+        return self.variables[name]
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, converting its operands
+        first through an explicit stack. Frozen sentences are converted
+        once; any other may have changed since it was last converted.
+        """
+        literals = {}
+        pending = [(sentence, False)]
+        while pending:
+            current, ready = pending.pop()
+            if id(current) in literals:
+                continue
+            if current.frozen() and current in self.literals:
+                literals[id(current)] = self.literals[current]
+                continue
+            operands = [
+                operand for operand in current.operands()
+                if isinstance(operand, Sentence)
+            ]
+            if not ready:
+                # Convert the operands first, leftmost first
+                pending.append((current, True))
+                pending.extend(
+                    (operand, False) for operand in reversed(operands)
+                )
+                continue
+            literal = tseitin(
+                current, [literals[id(operand)] for operand in operands], self
+            )
+            if current.frozen():
+                self.literals[current] = literal
+            literals[id(current)] = literal
+        return literals[id(sentence)]
+
+    def add(self, sentence):
+        """Adds clauses that hold exactly when `sentence` is true."""
+        pending = [sentence]
+        while pending:
+            sentence = pending.pop()
+            if isinstance(sentence, And):
+                pending.extend(reversed(sentence.conjuncts))
+            elif isinstance(sentence, Or):
+                self.clauses.append(
+                    [self.literal(disjunct) for disjunct in sentence.disjuncts]
+                )
+            elif isinstance(sentence, Implication):
+                self.clauses.append([-self.literal(sentence.antecedent),
+                                     self.literal(sentence.consequent)])
+            else:
+                self.clauses.append([self.literal(sentence)])
+
+
+def tseitin(sentence, operands, cnf):
+    """
+    Returns a literal of `cnf` equivalent to `sentence`, given the list of
+    its operands' literals, adding clauses that define it in terms of them.
+    """
+    if isinstance(sentence, Symbol):
+        return cnf.symbol(sentence.name)
+    if isinstance(sentence, Not):
+        return -operands[0]
+    if isinstance(sentence, And):
+        gate = cnf.variable()
+        for literal in operands:
+            cnf.clauses.append([-gate, literal])
+        cnf.clauses.append([gate] + [-literal for literal in operands])
+        return gate
+    if isinstance(sentence, Or):
+        gate = cnf.variable()
+        for literal in operands:
+            cnf.clauses.append([gate, -literal])
+        cnf.clauses.append([-gate] + operands)
+        return gate
+    if isinstance(sentence, Implication):
+        antecedent, consequent = operands
+        gate = cnf.variable()
+        cnf.clauses.append([gate, antecedent])
+        cnf.clauses.append([gate, -consequent])
+        cnf.clauses.append([-gate, -antecedent, consequent])
+        return gate
+    if isinstance(sentence, Biconditional):
+        left, right = operands
+        gate = cnf.variable()
+        cnf.clauses.append([-gate, -left, right])
+        cnf.clauses.append([-gate, left, -right])
+        cnf.clauses.append([gate, left, right])
+        cnf.clauses.append([gate, -left, -right])
+        return gate
+    raise Exception("nothing to convert")
+
+
+class Solver():
+
+    # Activity decay applied after every conflict
+    DECAY = 0.95
+
+    # Conflicts before the first restart, and how much later each next is
+    RESTART = 100
+    RESTART_GROWTH = 1.5
+
+    def __init__(self, cnf):
+        """
+        Create a conflict-driven clause learning solver for `cnf`,
+        watching two literals of every clause.
+        """
+        self.names = cnf.names
+        n = len(cnf.names) - 1
+        self.values = [None] * (n + 1)
+        self.levels = [0] * (n + 1)
+        self.reasons = [None] * (n + 1)
+        self.phases = [False] * (n + 1)
+        self.activity = [0.0] * (n + 1)
+        self.increment = 1.0
+        self.order = [(0.0, variable) for variable in range(1, n + 1)]
+        self.watches = {}
+        self.trail = []
+        self.limits = []
+        self.head = 0
+        self.ok = True
+
+        for clause in cnf.clauses:
+            clause = list(dict.fromkeys(clause))
+            if any(-literal in clause for literal in clause):
+                continue
+            if not clause:
+                self.ok = False
+            elif len(clause) == 1:
+                value = self.value(clause[0])
+                if value is False:
+                    self.ok = False
+                elif value is None:
+                    self.assign(clause[0], None)
+            else:
+                self.watch(clause)
+
+    def value(self, literal):
+        """Returns the truth value of `literal`, or None if unassigned."""
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def assign(self, literal, reason):
+        """Makes `literal` true at the current level because of `reason`."""
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def watch(self, clause):
+        """Watches the first two literals of `clause`."""
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses, returning
+        a clause with every literal false, or None.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watchers = self.watches.get(false, [])
+            self.watches[false] = kept = []
+            for i, clause in enumerate(watchers):
+                # Keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                if self.value(first) is True:
+                    kept.append(clause)
+                    continue
+
+                # Look for another literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(first) is False:
+                        kept.extend(watchers[i + 1:])
+                        return clause
+                    self.assign(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from `conflict` at its first unique
+        implication point, asserting literal first, and the level
+        to jump back to.
+        """
+        level = len(self.limits)
+        seen = set()
+        learned = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen:
+                    continue
+                if self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Resolve on the latest assigned literal seen at this level
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal that becomes false last
+        deepest = max(range(1, len(learned)),
+                      key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, variable):
+        """Raises the activity of `variable`, rescaling if it grows large."""
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+
+    def backtrack(self, level):
+        """Undoes every assignment made above `level`."""
+        if len(self.limits) <= level:
+            return
+        start = self.limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = self.values[variable]
+            self.values[variable] = None
+            self.reasons[variable] = None
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the most active unassigned variable, or None."""
+        while self.order:
+            _, variable = heapq.heappop(self.order)
+            if self.values[variable] is None:
+                return variable
+        return None
+
+    def solve(self):
+        """
+        Returns a satisfying model as a dictionary of symbol names to
+        truth values, or None if the formula is unsatisfiable.
+        """
+        if not self.ok:
+            return None
+        conflicts = 0
+        restart = self.RESTART
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.limits:
+                    self.ok = False
+                    return None
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= self.DECAY
+                conflicts += 1
+                continue
+
+            if conflicts >= restart:
+                conflicts = 0
+                restart = int(restart * self.RESTART_GROWTH)
+                self.backtrack(0)
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                return {
+                    name: self.values[variable]
+                    for variable, name in enumerate(self.names)
+                    if name is not None
+                }
+            self.limits.append(len(self.trail))
+            self.assign(variable if self.phases[variable] else -variable, None)
+
+
+def sat_check(knowledge, query):
+    """Checks entailment as unsatisfiability of knowledge ∧ ¬query."""
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return Solver(cnf).solve() is None
@@ -0,0 +1,154 @@
+import contextlib
+import importlib.util
+import io
+import os
+import runpy
+import sys
+import unittest
+from unittest import mock
+
+from counting import count_models
+from logic import *
+
+METHODS = ["enumerate", "components", "prune", "sat", "bdd"]
+
+# Every method besides "enumerate" that can run here
+ENGINES = ["components", "parallel", "prune", "sat", "bdd"] + (
+    ["numpy"] if importlib.util.find_spec("numpy") else []
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class NestedAddTest(unittest.TestCase):
+
+    def setUp(self):
+        self.a, self.b, self.c = Symbol("A"), Symbol("B"), Symbol("C")
+
+    def test_add_below_implication(self):
+        knowledge = And(self.a)
+        implication = Implication(knowledge, self.c)
+        knowledge.add(self.b)
+        self.assertEqual(implication.symbols(), {"A", "B", "C"})
+        for method in METHODS:
+            self.assertFalse(
+                model_check(implication, self.c, method=method), method
+            )
+
+    def test_add_below_conjunction(self):
+        outer = And(And(self.a))
+        outer.symbols()
+        outer.conjuncts[0].add(Not(self.b))
+        for method in METHODS:
+            self.assertTrue(
+                model_check(outer, Not(self.b), method=method), method
+            )
+
+    def test_equal_conjunctions_stay_distinct(self):
+        first, second = And(self.a), And(self.a)
+        self.assertIs(Not(second).operand, second)
+        self.assertEqual(Not(first), Not(second))
+        first.add(self.b)
+        self.assertNotEqual(Not(first), Not(second))
+
+    def test_model_check_many_after_add(self):
+        knowledge = And(self.a)
+        self.assertEqual(model_check_many(knowledge, [self.b]), ["unknown"])
+        knowledge.add(self.b)
+        self.assertEqual(model_check_many(knowledge, [self.b]), ["entailed"])
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.a, self.b = Symbol("A"), Symbol("B")
+        self.knowledge = And(Or(self.a, self.b),
+                             Implication(And(self.a), self.b))
+
+    def test_hash_and_symbols_kept_between_adds(self):
+        with mock.patch.object(And, "operands", autospec=True,
+                               side_effect=And.operands) as operands:
+            symbols = self.knowledge.symbol_set()
+            value = hash(self.knowledge)
+            computed = operands.call_count
+            self.assertEqual(hash(self.knowledge), value)
+            self.assertIs(self.knowledge.symbol_set(), symbols)
+            self.assertEqual(operands.call_count, computed)
+
+            self.knowledge.add(Not(Symbol("C")))
+            self.assertEqual(self.knowledge.symbols(), {"A", "B", "C"})
+            self.assertNotEqual(hash(self.knowledge), value)
+            self.assertGreater(operands.call_count, computed)
+
+    def test_models_kept_until_add(self):
+        with mock.patch.object(And, "compile", autospec=True,
+                               side_effect=Sentence.compile) as compile:
+            self.assertEqual(model_check_many(self.knowledge, [self.b]),
+                             ["entailed"])
+            self.assertEqual(model_check_many(self.knowledge, [self.a]),
+                             ["unknown"])
+            self.assertEqual(compile.call_count, 1)
+
+            self.knowledge.add(self.a)
+            self.assertEqual(model_check_many(self.knowledge, [self.a]),
+                             ["entailed"])
+            self.assertEqual(compile.call_count, 2)
+
+
+class DeepNestingTest(unittest.TestCase):
+
+    def test_nested_implications(self):
+        n = sys.getrecursionlimit() + 200
+        sentence = Symbol("x0")
+        for i in range(1, n):
+            sentence = Implication(Symbol(f"x{i}"), sentence)
+        self.assertTrue(model_check(Symbol("x0"), sentence, method="sat"))
+        self.assertFalse(
+            model_check(Not(Symbol("x0")), sentence, method="sat")
+        )
+        self.assertEqual(count_models(sentence), 2 ** n - 1)
+
+
+class AgreementTest(unittest.TestCase):
+
+    def script(self, *path):
+        """Runs a script quietly and returns its global variables."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            return runpy.run_path(os.path.join(HERE, *path))
+
+    def check(self, knowledge, symbols):
+        """Checks that every method answers as "enumerate" does."""
+        for symbol in symbols:
+            for query in [symbol, Not(symbol)]:
+                expected = model_check(knowledge, query)
+                for method in ENGINES:
+                    with self.subTest(query=query, method=method):
+                        self.assertEqual(
+                            model_check(knowledge, query, method=method),
+                            expected
+                        )
+
+    def test_knights(self):
+        puzzle = self.script("..", "knights", "puzzle.py")
+        symbols = [Symbol(f"{person}{kind}")
+                   for person in "ABC" for kind in ["Knight", "Knave"]]
+        for i in range(4):
+            self.check(puzzle[f"knowledge{i}"], symbols)
+
+    def test_houses(self):
+        puzzle = self.script("puzzle.py")
+        self.check(puzzle["knowledge"], puzzle["symbols"])
+
+    def test_mastermind(self):
+        mastermind = self.script("mastermind.py")
+        self.check(mastermind["knowledge"], mastermind["symbols"])
+
+    @unittest.skipUnless(importlib.util.find_spec("termcolor"),
+                         "clue.py needs termcolor")
+    def test_clue(self):
+        clue = self.script("clue.py")
+        self.check(clue["knowledge"], clue["symbols"])
+
+
+if __name__ == "__main__":
+    unittest.main()